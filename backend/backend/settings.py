@@ -63,6 +63,8 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'mydatabase.sqlite3',
+        # Файл, а не память: воркеры fill_db в тестах открывают базу из своих процессов.
+        'TEST': {'NAME': 'test_mydatabase.sqlite3'},
     },
 }
 
@@ -105,6 +107,10 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
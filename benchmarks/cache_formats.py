@@ -0,0 +1,70 @@
+"""
+Size and load time of the schema cache formats for a synthetic project.
+
+    python benchmarks/cache_formats.py [--models 1000] [--repeat 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fill_db.cache import CACHE_FORMATS, TablesMap  # noqa: E402
+
+
+MODELS_PER_APP = 50
+
+
+def synthetic_schema(models: int) -> TablesMap:
+    # Таблицы того же вида, что пишет Parser: поля, ограничения, fk на соседние модели и m2m.
+    data = {}
+    for i in range(models):
+        app, t = f"app{i // MODELS_PER_APP}", f"model{i}"
+        parent = f"app{(i - 1) // MODELS_PER_APP}.model{i - 1}" if i else None
+        data.setdefault(app, {})[t] = {
+            "contenttype_id": f"{app}.{t}",
+            "fingerprint": f"{i:040x}",
+            "simple": {
+                "title": "CharField",
+                "slug": "SlugField",
+                "text": "TextField",
+                "amount": "PositiveIntegerField",
+                "price": "DecimalField",
+                "created": "DateTimeField",
+                "is_active": "BooleanField",
+            },
+            "constraints": {
+                "title": {"max_length": 200, "validators": []},
+                "slug": {"max_length": 50, "validators": [{"type": "RegexValidator", "regex": "^[-a-zA-Z0-9_]+$"}]},
+                "amount": {"max_length": None, "validators": [{"type": "MinValueValidator", "limit_value": 1}]},
+            },
+            "fk": {"parent_id": parent} if parent else {},
+            "mtm": {"tags": {"contenttype_id": parent, "related_name": f"model{i}_set"}} if parent else {},
+            "unique": [["title", "slug"]],
+            "default_related_name": None,
+            "model_name": f"Model{i}",
+        }
+    return data
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--models", type=int, default=1000)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    data = synthetic_schema(args.models)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, cache_cls in CACHE_FORMATS.items():
+            cache = cache_cls(os.path.join(cache_dir, f"parsed_cache.{cache_cls.extension}"))
+            cache.write(data)
+            assert cache.read() == data, f"{name} cache does not round-trip"
+            size = os.path.getsize(cache.path)
+            load = min(timeit.repeat(cache.read, number=1, repeat=args.repeat))
+            print(f"{name:>6}: {size / 1024:8.1f} KiB, load {load * 1000:7.2f} ms ({args.models} models)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-row against column-wise value generation for auth.User and foodgram.Recipe.
+
+    python benchmarks/field_generators.py [--rows 100000] [--batch-size 1000]
+
+Both sides call the same generators from GeneratorRegistry: per row with
+size 1, column-wise with a whole batch per call, as the fill engine does.
+Relations, primary keys and file fields (they write to MEDIA_ROOT) are
+left out. Needs no database.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "backend")]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.apps import apps  # noqa: E402
+from django.db.models import Field as ModelField, FileField  # noqa: E402
+
+from fill_db.generators import Generator  # noqa: E402
+from fill_db.registry import GeneratorRegistry  # noqa: E402
+
+
+MODELS = ("auth.User", "foodgram.Recipe")
+
+
+def get_columns(registry: GeneratorRegistry) -> list[tuple[ModelField, Generator]]:
+    fields = [
+        field for label in MODELS for field in apps.get_model(label)._meta.concrete_fields
+        if not field.is_relation and not field.primary_key and not isinstance(field, FileField)
+    ]
+    return [(field, registry.get(field)) for field in fields]
+
+
+def per_row(field: ModelField, generator: Generator, rows: int, batch_size: int, rng: np.random.Generator) -> None:
+    for _ in range(rows):
+        generator(field, 1, rng)
+
+
+def column_wise(field: ModelField, generator: Generator, rows: int, batch_size: int, rng: np.random.Generator) -> None:
+    for start in range(0, rows, batch_size):
+        generator(field, min(batch_size, rows - start), rng)
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=100_000)
+    arg_parser.add_argument("--batch-size", type=int, default=1000)
+    args = arg_parser.parse_args()
+
+    columns = get_columns(GeneratorRegistry())
+    totals = {per_row: 0.0, column_wise: 0.0}
+    for field, generator in columns:
+        elapsed = {}
+        for mode in totals:
+            rng = np.random.default_rng(0)
+            started = time.perf_counter()
+            mode(field, generator, args.rows, args.batch_size, rng)
+            elapsed[mode] = time.perf_counter() - started
+            totals[mode] += elapsed[mode]
+        label = f"{field.model._meta.label_lower}.{field.name} ({type(field).__name__})"
+        print(f"{label:>56}: per row {elapsed[per_row]:6.2f}s, column-wise {elapsed[column_wise]:6.3f}s")
+    print(
+        f"{len(columns)} columns, {args.rows} rows: per row {totals[per_row]:.2f}s, "
+        f"column-wise {totals[column_wise]:.2f}s ({totals[per_row] / totals[column_wise]:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
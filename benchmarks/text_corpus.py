@@ -0,0 +1,105 @@
+"""
+Time and peak memory of text values: corpus slices against per-row sentences.
+
+    python benchmarks/text_corpus.py [--rows 1000000] [--batch-size 1000] [--length 120]
+
+Values are made in batches and dropped, as in a fill, so the peak is the
+working set of one batch. The per-row baseline is Faker's text() when Faker
+is installed (it comes with factory-boy from pyproject.toml). Without Faker
+the baseline joins random words per row with the random module: the same
+shape as Faker's sentences and cheaper than them.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fill_db.corpus import TEXT_ALPHABETS, get_corpus  # noqa: E402
+
+try:
+    from faker import Faker
+except ImportError:
+    Faker = None
+
+
+Batch = Callable[[int], list[str]]
+
+
+def corpus_batch(length: int) -> Batch:
+    # Как generate_text: длина от половины до max_length.
+    corpus = get_corpus(TEXT_ALPHABETS["latin"], words=True)
+    rng = np.random.default_rng(0)
+    return lambda size: corpus.cut(rng, size, length // 2, length)
+
+
+def random_sentence(rnd: random.Random, length: int) -> str:
+    target = rnd.randint(length // 2, length)
+    words = []
+    total = 0
+    while total < target:
+        word = "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(2, 10)))
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:target]
+
+
+def per_row_batch(length: int) -> Batch:
+    if Faker is not None:
+        Faker.seed(0)
+        fake = Faker()
+        return lambda size: [fake.text(max_nb_chars=length) for _ in range(size)]
+    rnd = random.Random(0)
+    return lambda size: [random_sentence(rnd, length) for _ in range(size)]
+
+
+def run(batch: Batch, rows: int, batch_size: int) -> None:
+    for start in range(0, rows, batch_size):
+        batch(min(batch_size, rows - start))
+
+
+def measure(make_batch: Callable[[], Batch], rows: int, batch_size: int) -> tuple[float, int]:
+    batch = make_batch()
+    started = time.perf_counter()
+    run(batch, rows, batch_size)
+    elapsed = time.perf_counter() - started
+    # Пик памяти отдельным проходом: трассировка замедляет выделения и исказила бы время.
+    batch = make_batch()
+    tracemalloc.start()
+    run(batch, rows, batch_size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--batch-size", type=int, default=1000)
+    arg_parser.add_argument("--length", type=int, default=120)
+    args = arg_parser.parse_args()
+
+    # Буфер строится один раз на алфавит и процесс, в замеры срезов он не входит.
+    started = time.perf_counter()
+    corpus_batch(args.length)
+    print(f"corpus build: {time.perf_counter() - started:.3f}s")
+
+    for name, make_batch in (
+        ("corpus slices", lambda: corpus_batch(args.length)),
+        ("faker text() per row" if Faker else "random words per row", lambda: per_row_batch(args.length)),
+    ):
+        elapsed, peak = measure(make_batch, args.rows, args.batch_size)
+        print(f"{name:>22}: {elapsed:6.2f}s, peak {peak / 2 ** 20:6.2f} MiB ({args.rows} values)")
+    if Faker is None:
+        print("Faker is not installed, the per-row baseline is random words joined with the random module.")
+
+
+if __name__ == "__main__":
+    main()
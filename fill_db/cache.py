@@ -0,0 +1,74 @@
+import os
+import json
+import struct
+from typing import Any, Optional
+
+from .exceptions import SchemaCacheError
+
+
+TablesMap = dict[str, dict[str, dict[str, Any]]]
+
+
+class JsonSchemaCache:
+
+    extension = "json"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self) -> TablesMap:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write(self, data: TablesMap) -> None:
+        with open(self.path, "w") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class BinarySchemaCache(JsonSchemaCache):
+    """
+    Layout: magic, version, then the whole schema as compact json. Both
+    formats are read whole, fill needs every table; the gain is file size.
+    """
+
+    extension = "bin"
+    magic = b"AFDB"
+    version = 2
+    header = struct.Struct("<4sI")
+
+    def _read(self) -> TablesMap:
+        with open(self.path, "rb") as f:
+            buf = f.read()
+        magic, version = self.header.unpack_from(buf)
+        if magic != self.magic or version != self.version:
+            raise SchemaCacheError(f"{self.path} is not a schema cache of version {self.version}")
+        return json.loads(buf[self.header.size:])
+
+    def read(self) -> TablesMap:
+        # Пустой, обрезанный или чужой файл считается пустым кэшем, как и битый json.
+        try:
+            return self._read()
+        except (FileNotFoundError, ValueError, struct.error, SchemaCacheError):
+            return {}
+
+    def write(self, data: TablesMap) -> None:
+        with open(self.path, "wb") as f:
+            f.write(self.header.pack(self.magic, self.version))
+            f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+
+
+CACHE_FORMATS = {
+    "json": JsonSchemaCache,
+    "binary": BinarySchemaCache,
+}
+
+
+def get_schema_cache(cache_dir: str, cache_filename: Optional[str], cache_format: str) -> JsonSchemaCache:
+
+    assert cache_format in CACHE_FORMATS, f"'cache_format' in config must be one of {', '.join(CACHE_FORMATS)}"
+    cache_cls = CACHE_FORMATS[cache_format]
+    filename = cache_filename or f"parsed_cache.{cache_cls.extension}"
+    return cache_cls(os.path.join(cache_dir, filename))
@@ -23,7 +23,31 @@ class Config(MessageHandler):
             "apps_exclude": [],
             "tables_exclude": {},
             "cache_dir": django_settings.BASE_DIR,
-            "cache_filename": "parsed_cache.json",
+            "cache_filename": None,
+            "cache_format": "json",
+            "offline": False,
+            "batch_size": 1000,
+            "generators": {},
+            "unique_generators": {},
+            "reserve_pks": False,
+            "m2m_fanout": 3,
+            "workers": 1,
+            "pipeline": False,
+            "pipeline_depth": 4,
+            "writer": "orm",
+            "bulk_session": False,
+            "transaction_rows": 100000,
+            "rebuild_indexes": False,
+            "user_password": "password",
+            "user_password_hasher": None,
+            "media_pool_size": 8,
+            "media_image_size": 64,
+            "media_file_size": 1024,
+            "media_distinct": False,
+            "media_threads": 4,
+            "text_alphabet": "latin",
+            "seed": None,
+            "relations": {},
             "ignore_tables": self.get_ignore_tables(),
         }
 
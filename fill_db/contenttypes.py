@@ -0,0 +1,14 @@
+from typing import Union
+
+from django.apps import apps as django_apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Model
+
+
+ContentTypeRef = Union[int, str]
+
+
+def get_model(ref: ContentTypeRef) -> type[Model]:
+    if isinstance(ref, str):
+        return django_apps.get_model(ref)
+    return ContentType.objects.get_for_id(ref).model_class()
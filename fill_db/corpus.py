@@ -0,0 +1,63 @@
+import string
+import zlib
+
+import numpy as np
+
+
+CORPUS_SIZE = 1 << 20
+WORD_LENGTHS = (2, 10)
+
+CYRILLIC_LOWERCASE = "абвгдеёжзийклмнопрстуфхцчшщъыьэюя"
+CYRILLIC = CYRILLIC_LOWERCASE + CYRILLIC_LOWERCASE.upper()
+# Режимы алфавита для строк и текстов; все они проходят validate_name вида ^[а-яА-ЯёЁa-zA-Z]*$.
+ALPHABETS = {
+    "latin": string.ascii_letters,
+    "cyrillic": CYRILLIC,
+    "mixed": string.ascii_letters + CYRILLIC,
+}
+TEXT_ALPHABETS = {
+    "latin": string.ascii_lowercase,
+    "cyrillic": CYRILLIC_LOWERCASE,
+    "mixed": string.ascii_lowercase + CYRILLIC_LOWERCASE,
+}
+
+
+class Corpus:
+    """
+    One preloaded buffer of random characters, optionally split into words.
+    A column of strings is cut from it as slices at random offsets: one
+    slice per value instead of one random draw per character.
+    """
+
+    __slots__ = ("buffer",)
+
+    def __init__(self, alphabet: str, words: bool = False, size: int = CORPUS_SIZE):
+        # Зерно из алфавита: буфер одинаков во всех процессах и запусках, случайны только срезы.
+        rng = np.random.default_rng(zlib.crc32(f"{alphabet}:{words}".encode()))
+        chars = np.array(list(alphabet), dtype="<U1")[rng.integers(0, len(alphabet), size)]
+        if words:
+            low, high = WORD_LENGTHS
+            spaces = np.cumsum(rng.integers(low + 1, high + 2, size // (low + 1)))
+            chars[spaces[spaces < size]] = " "
+        self.buffer = str(chars.view(f"<U{size}")[0])
+
+    def cut(self, rng: np.random.Generator, size: int, low: int, high: int) -> list[str]:
+
+        if high <= 0:
+            return [""] * size
+        assert high < len(self.buffer), f"string length {high} exceeds the corpus size {len(self.buffer)}"
+        buffer = self.buffer
+        starts = rng.integers(0, len(buffer) - high, size).tolist()
+        if low == high:
+            return [buffer[start:start + high] for start in starts]
+        lengths = rng.integers(low, high, size, endpoint=True).tolist()
+        return [buffer[start:start + length] for start, length in zip(starts, lengths)]
+
+
+CORPORA: dict[tuple[str, bool], Corpus] = {}
+
+
+def get_corpus(alphabet: str, words: bool = False) -> Corpus:
+    if (alphabet, words) not in CORPORA:
+        CORPORA[alphabet, words] = Corpus(alphabet, words)
+    return CORPORA[alphabet, words]
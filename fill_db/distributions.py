@@ -0,0 +1,222 @@
+from functools import lru_cache
+from typing import Optional, Union
+
+import numpy as np
+from django.db.models import Model
+
+from .contenttypes import ContentTypeRef, get_model
+from .handers import MessageHandler
+from .planner import Planner
+
+
+RESAMPLE_ATTEMPTS = 100
+
+
+@lru_cache(maxsize=32)
+def zipf_cdf(space: int, a: float) -> np.ndarray:
+    cdf = np.cumsum(np.arange(1, space + 1, dtype=np.float64) ** -a)
+    return cdf / cdf[-1]
+
+
+def zipf_indices(rng: np.random.Generator, size: int, space: int, a: float) -> np.ndarray:
+    # Ранг k выпадает с вероятностью ~ 1 / k^a: один searchsorted по накопленным весам на всю пачку.
+    return np.searchsorted(zipf_cdf(space, a), rng.random(size), side="right")
+
+
+def truncated_normal(
+    rng: np.random.Generator, size: int, mean: float, std: float, low: float, high: float,
+) -> np.ndarray:
+    values = rng.normal(mean, std, size)
+    for _ in range(RESAMPLE_ATTEMPTS):
+        outside = (values < low) | (values >= high)
+        if not outside.any():
+            return values
+        values[outside] = rng.normal(mean, std, int(outside.sum()))
+    # Почти вся масса за границами: остаток прижимается к ним.
+    return values.clip(low, np.nextafter(high, low))
+
+
+class Distribution:
+    """
+    Which parent rows a relation references, as indices into the parent's
+    key pool. The base class is uniform; skewed subclasses draw whole
+    batches at once.
+    """
+
+    __slots__ = ()
+    skewed = False
+
+    def sample(self, size: int, space: int, rng: np.random.Generator, start: int = 0) -> np.ndarray:
+        return rng.integers(0, space, size)
+
+    def __repr__(self):
+        params = ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__)
+        return f"<{type(self).__name__} {params}>"
+
+
+class ZipfDistribution(Distribution):
+    """
+    Parent of rank k (in key order, the first key is the most popular) is
+    referenced with probability proportional to 1 / k^a.
+    """
+
+    __slots__ = ("a",)
+    skewed = True
+
+    def __init__(self, a: float = 1.0):
+        assert a > 0, "zipf 'a' in 'relations' config must be positive"
+        self.a = a
+
+    def sample(self, size: int, space: int, rng: np.random.Generator, start: int = 0) -> np.ndarray:
+        return zipf_indices(rng, size, space, self.a)
+
+
+class NormalDistribution(Distribution):
+    """
+    Normal distribution over the parent keys: mean, std and bounds are
+    fractions of the key pool, 0.5 is its middle.
+    """
+
+    __slots__ = ("mean", "std", "bounds")
+    skewed = True
+
+    def __init__(self, mean: float = 0.5, std: float = 0.15, bounds: tuple[float, float] = (0.0, 1.0)):
+        low, high = bounds
+        assert std > 0, "normal 'std' in 'relations' config must be positive"
+        assert 0 <= low < high <= 1, "normal 'bounds' in 'relations' config must be fractions 0 <= low < high <= 1"
+        self.mean = mean
+        self.std = std
+        self.bounds = (low, high)
+
+    def sample(self, size: int, space: int, rng: np.random.Generator, start: int = 0) -> np.ndarray:
+        return (truncated_normal(rng, size, self.mean, self.std, *self.bounds) * space).astype(np.int64)
+
+
+class FixedDistribution(Distribution):
+    """
+    Every parent gets exactly `fanout` consecutive rows, then the parents
+    repeat from the first one.
+    """
+
+    __slots__ = ("fanout",)
+    skewed = True
+
+    def __init__(self, fanout: int = 1):
+        assert isinstance(fanout, int) and fanout > 0, "fixed 'fanout' in 'relations' config must be a positive int"
+        self.fanout = fanout
+
+    def sample(self, size: int, space: int, rng: np.random.Generator, start: int = 0) -> np.ndarray:
+        # От номера строки, а не от rng: части таблицы продолжают одну и ту же последовательность.
+        return np.arange(start, start + size) // self.fanout % space
+
+
+DISTRIBUTIONS: dict[str, type[Distribution]] = {
+    "uniform": Distribution,
+    "zipf": ZipfDistribution,
+    "normal": NormalDistribution,
+    "fixed": FixedDistribution,
+}
+
+
+def parse_distribution(label: str, conf: dict) -> Distribution:
+    conf = dict(conf)
+    name = conf.pop("distribution", "uniform")
+    assert name in DISTRIBUTIONS, (
+        f"distribution of {label} in 'relations' config must be one of {', '.join(DISTRIBUTIONS)}"
+    )
+    distribution_cls = DISTRIBUTIONS[name]
+    unknown = set(conf) - set(distribution_cls.__slots__)
+    assert not unknown, f"unexpected {name} parameters of {label} in 'relations' config: {', '.join(sorted(unknown))}"
+    return distribution_cls(**conf)
+
+
+class Fanout:
+    """
+    Links per row of a many-to-many relation: a number from low to high,
+    drawn from a distribution over that range.
+    """
+
+    __slots__ = ("low", "high", "distribution")
+
+    def __init__(self, low: int, high: int, distribution: Optional[Distribution] = None):
+        assert 0 <= low <= high, "many-to-many 'fanout' in 'relations' config must satisfy 0 <= low <= high"
+        self.low = low
+        self.high = high
+        self.distribution = distribution or Distribution()
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return self.low + self.distribution.sample(size, self.high - self.low + 1, rng)
+
+    @classmethod
+    def parse(cls, label: str, conf: Union[int, dict]) -> "Fanout":
+        if isinstance(conf, int):
+            return cls(conf, conf)
+        assert isinstance(conf, dict), f"'fanout' of {label} in 'relations' config must be int or dict instance"
+        conf = dict(conf)
+        low, high = conf.pop("low", 1), conf.pop("high", None)
+        assert isinstance(high, int), f"'fanout' of {label} in 'relations' config needs an int 'high'"
+        distribution = parse_distribution(label, conf)
+        assert not isinstance(distribution, FixedDistribution), f"'fanout' of {label} can not be fixed, use an int"
+        return cls(low, high, distribution)
+
+
+class RelationDistribution:
+
+    __slots__ = ("distribution", "fanout")
+
+    def __init__(self, distribution: Distribution, fanout: Optional[Fanout] = None):
+        self.distribution = distribution
+        self.fanout = fanout
+
+    @classmethod
+    def parse(cls, label: str, conf: dict, many_to_many: bool) -> "RelationDistribution":
+        assert isinstance(conf, dict), f"{label} in 'relations' config must be dict instance"
+        conf = dict(conf)
+        if not many_to_many:
+            return cls(parse_distribution(label, conf))
+        # У m2m fanout - число связей строки, а не строк на родителя, поэтому fixed для целей не подходит.
+        fanout = conf.pop("fanout", None)
+        distribution = parse_distribution(label, conf)
+        assert not isinstance(distribution, FixedDistribution), (
+            f"{label} is many-to-many, set links per row with 'fanout' instead of the fixed distribution"
+        )
+        return cls(distribution, None if fanout is None else Fanout.parse(label, fanout))
+
+
+def relation_label(model_cls: type[Model], attname: str) -> str:
+    # В конфиге связь называется по имени поля, а в схеме fk хранятся по attname (author_id).
+    for field in model_cls._meta.get_fields():
+        if getattr(field, "attname", None) == attname:
+            return f"{model_cls._meta.label_lower}.{field.name}"
+    return f"{model_cls._meta.label_lower}.{attname}"
+
+
+class RelationDistributions(MessageHandler):
+    """
+    Distributions of the fk and many-to-many relations set in
+    AUTO_FILL_CONFIG['relations'], keyed by 'app_label.model.field'.
+    """
+
+    def __init__(self, relations: Optional[dict[str, dict]] = None):
+        relations = relations or {}
+        assert isinstance(relations, dict), "'relations' in config must be dict instance"
+        self.relations = relations
+        self.compiled: dict[tuple[ContentTypeRef, str], RelationDistribution] = {}
+
+    def compile(self, planner: Planner) -> None:
+        found = set()
+        for table in planner.tables.values():
+            model_cls = get_model(table.contenttype)
+            for relations, many_to_many in ((table.fks, False), (table.mtms, True)):
+                for relation in relations:
+                    label = relation_label(model_cls, relation.attname)
+                    if label in self.relations:
+                        self.compiled[table.contenttype, relation.attname] = RelationDistribution.parse(
+                            label, self.relations[label], many_to_many,
+                        )
+                        found.add(label)
+        for label in sorted(set(self.relations) - found):
+            self.stdout.write(f"WARNING: relation {label} from 'relations' config is not filled, it is ignored.")
+
+    def get(self, contenttype: ContentTypeRef, attname: str) -> Optional[RelationDistribution]:
+        return self.compiled.get((contenttype, attname))
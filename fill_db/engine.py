@@ -0,0 +1,454 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+from django.db import connection, connections
+from django.db.models import Max, Model
+
+from .contenttypes import ContentTypeRef, get_model
+from .distributions import Distribution, Fanout, RelationDistributions
+from .handers import MessageHandler
+from .indexes import IndexRebuilder
+from .memory import MemoryGuard
+from .partitions import Partition, split_rows
+from .pipeline import Pipeline, StageTimes, timed
+from .planner import Planner
+from .pools import INTEGER_PK_TYPES, PKPool, PKRange
+from .registry import Column, CompiledTable, GeneratorRegistry, UniqueColumn
+from .schema import Relation, Schema, Table
+from .sequences import can_reserve, reserve_range, reset_sequences
+from .session import BulkLoadSession
+from .unique import SkewedTuples, UniqueTuples, distinct_links
+from .writers import OrmWriter, get_raw_writer
+
+
+class FillEngine(MessageHandler):
+
+    def __init__(
+        self,
+        schema: Schema,
+        rows: int,
+        batch_size: int,
+        max_memory: Optional[int] = None,
+        registry: Optional[GeneratorRegistry] = None,
+        reserve_pks: bool = False,
+        m2m_fanout: int = 3,
+        workers: int = 1,
+        pipeline: bool = False,
+        pipeline_depth: int = 4,
+        writer: str = "orm",
+        bulk_session: bool = False,
+        transaction_rows: Optional[int] = None,
+        rebuild_indexes: bool = False,
+        seed: Optional[int] = None,
+        relations: Optional[dict[str, dict]] = None,
+    ):
+        self.schema = schema
+        self.planner = Planner(schema)
+        self.registry = registry or GeneratorRegistry()
+        self.compiled: dict[str, CompiledTable] = {}
+        self.rows = rows
+        self.guard = MemoryGuard(batch_size, max_memory)
+        # Все потоки случайных чисел порождаются от одного корня: с заданным seed заполнение воспроизводимо.
+        self.seed = seed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.reserve_pks = reserve_pks
+        self.m2m_fanout = m2m_fanout
+        self.workers = workers
+        self.pipeline = pipeline
+        self.pipeline_depth = pipeline_depth
+        self.writer = writer
+        self.session = BulkLoadSession(bulk_session, transaction_rows)
+        self.rebuild_indexes = rebuild_indexes
+        self.distributions = RelationDistributions(relations)
+        self.pools: dict[ContentTypeRef, Union[PKPool, PKRange]] = {}
+        # Только строки, созданные в этом запуске: связи m2m добавляются им, старые строки не трогаются,
+        # а уникальные наборы fk берут из них одну колонку, чтобы не совпасть с наборами прошлых запусков.
+        self.created: dict[ContentTypeRef, Union[PKPool, PKRange]] = {}
+        self.reserved: list[type[Model]] = []
+        if seed is not None and max_memory:
+            self.stdout.write(
+                "WARNING: a seeded fill is reproducible only while the batch size stays the same, "
+                "the memory limit may reduce it."
+            )
+
+    def get_fk_pool(self, table: Table, target: ContentTypeRef) -> Union[PKPool, PKRange]:
+        if target == table.contenttype or target not in self.pools:
+            return PKPool.load(get_model(target))
+        return self.pools[target]
+
+    @staticmethod
+    def get_offset(model_cls: type[Model], pk_range: Optional[PKRange]) -> int:
+        # Счетчики уникальных значений продолжаются с максимального ключа, чтобы не пересечься с прошлыми запусками.
+        if pk_range:
+            return pk_range.start - 1
+        if model_cls._meta.pk.get_internal_type() in INTEGER_PK_TYPES:
+            return model_cls._default_manager.aggregate(current_max=Max("pk"))["current_max"] or 0
+        return model_cls._default_manager.count()
+
+    def get_columns(
+        self, table: Table, model_cls: type[Model], partition: Partition, rng: np.random.Generator,
+    ) -> tuple[Column, ...]:
+
+        offset = partition.offset
+        columns = {}
+        for attname, column, unique in self.compiled[table.label]:
+            if unique:
+                # Пробное значение для последней строки: нехватка уникальных значений видна до первой вставки.
+                if partition.rows:
+                    column(1, rng, offset + partition.rows - 1)
+                column = self.get_counter_column(column, offset)
+            columns[attname] = column
+
+        fk_pools = {r.attname: self.get_fk_pool(table, r.target) for r in table.fks}
+        columns.update({
+            attname: self.get_fk_column(pool, self.get_distribution(table, attname), partition.position)
+            for attname, pool in fk_pools.items()
+        })
+        grouped = set()
+        for fields_set in table.unique_fk_sets:
+            if grouped.intersection(fields_set):
+                self.stdout.write(
+                    f"WARNING: {table.label} unique set {fields_set} overlaps another one and is not enforced."
+                )
+                continue
+            # Перестановка общая для всех частей таблицы (зерно таблицы), каждая часть идет со своей позиции.
+            skewed = self.get_skewed(table, fields_set)
+            set_pools = self.get_unique_pools(table, fields_set, fk_pools, partition, keep=tuple(skewed[:1]))
+            tuples_rng = np.random.default_rng(partition.seed)
+            if skewed:
+                lead = skewed[0]
+                if len(skewed) > 1:
+                    self.stdout.write(
+                        f"WARNING: {table.label} unique set {fields_set} follows the distribution of {lead} only."
+                    )
+                distribution = self.get_distribution(table, lead)
+                tuples = SkewedTuples(table.label, set_pools, lead, distribution, self.rows, tuples_rng)
+            else:
+                tuples = UniqueTuples(table.label, set_pools, self.rows, tuples_rng, partition.position)
+            columns.update({attname: tuples.column(attname) for attname in fields_set})
+            grouped.update(fields_set)
+
+        if partition.pk_range:
+            columns[model_cls._meta.pk.attname] = self.get_counter_column(self.pk_column, partition.pk_range.start)
+        # Колонки в порядке concrete_fields: позиционные аргументы заметно быстрее Model(**kwargs).
+        return tuple(columns.get(field.attname, self.empty_column) for field in model_cls._meta.concrete_fields)
+
+    @staticmethod
+    def empty_column(size: int, rng: np.random.Generator) -> list:
+        return [None] * size
+
+    @staticmethod
+    def pk_column(size: int, rng: np.random.Generator, start: int) -> list:
+        return list(range(start, start + size))
+
+    def get_fk_column(
+        self, pool: Union[PKPool, PKRange], distribution: Optional[Distribution] = None, start: int = 0,
+    ) -> Column:
+
+        if not len(pool):
+            return self.empty_column
+        if not distribution or not distribution.skewed:
+            return lambda size, rng: pool.sample(size, rng).tolist()
+        position = start
+
+        def fk_column(size: int, rng: np.random.Generator) -> list:
+            nonlocal position
+            values = pool.take(distribution.sample(size, len(pool), rng, position)).tolist()
+            position += size
+            return values
+
+        return fk_column
+
+    def get_unique_pools(
+        self,
+        table: Table,
+        fields_set: tuple[str, ...],
+        fk_pools: dict[str, Union[PKPool, PKRange]],
+        partition: Partition,
+        keep: tuple[str, ...] = (),
+    ) -> dict[str, Union[PKPool, PKRange]]:
+
+        # Набор с родителем, созданным в этом запуске, не может совпасть с уже записанными строками:
+        # одной такой колонки достаточно, остальные берут всех родителей.
+        pools = {attname: fk_pools[attname] for attname in fields_set}
+        targets = {r.attname: r.target for r in table.fks}
+        # Колонки из keep ограничиваются в последнюю очередь: распределение ведущей колонки идет по всем родителям.
+        for attname in sorted(fields_set, key=lambda attname: attname in keep):
+            target = targets[attname]
+            created = self.created.get(target)
+            if target == table.contenttype or created is None:
+                continue
+            if isinstance(created, PKRange) or created.is_numeric:
+                pools[attname] = created
+                return pools
+        # Смещение первой части - максимальный ключ до заполнения: строки в таблице уже были.
+        if partition.index == 0 and partition.offset:
+            self.stdout.write(
+                f"WARNING: {table.label} unique set {fields_set} has no parent filled in this run, "
+                "it may collide with existing rows."
+            )
+        return pools
+
+    def get_distribution(self, table: Table, attname: str) -> Optional[Distribution]:
+        relation = self.distributions.get(table.contenttype, attname)
+        return relation.distribution if relation else None
+
+    def get_skewed(self, table: Table, fields_set: tuple[str, ...]) -> list[str]:
+        return [
+            attname for attname in fields_set
+            if (distribution := self.get_distribution(table, attname)) and distribution.skewed
+        ]
+
+    @staticmethod
+    def get_counter_column(column: UniqueColumn, start: int) -> Column:
+        counter = start
+
+        def counter_column(size: int, rng: np.random.Generator) -> list:
+            nonlocal counter
+            values = column(size, rng, counter)
+            counter += size
+            return values
+
+        return counter_column
+
+    def iter_values(self, table: Table, model_cls: type[Model], partition: Partition) -> Iterator[list[list]]:
+        # Колонки собираются сразу, в вызывающем потоке: запросы пулов и пробы уникальности идут до старта конвейера.
+        rng = np.random.default_rng(partition.stream)
+        return self.iter_chunks(self.get_columns(table, model_cls, partition, rng), partition.rows, rng)
+
+    def iter_chunks(self, columns: tuple[Column, ...], rows: int, rng: np.random.Generator) -> Iterator[list[list]]:
+        remaining = rows
+        while remaining > 0:
+            size = min(self.guard.chunk_size, remaining)
+            yield [column(size, rng) for column in columns]
+            remaining -= size
+
+    def get_writer(self, model_cls: type[Model], include_pk: bool, ignore_conflicts: bool = False) -> OrmWriter:
+        # Прямая запись (executemany / COPY), где она поддерживается, иначе bulk_create.
+        writer_cls = OrmWriter
+        if self.writer == "raw":
+            writer_cls = get_raw_writer(model_cls, ignore_conflicts) or OrmWriter
+        return writer_cls(model_cls, include_pk, ignore_conflicts)
+
+    def write(self, writer: OrmWriter, batches: Iterable, times: Optional[StageTimes] = None) -> int:
+
+        # Транзакция фиксируется каждые transaction_rows строк, без ограничения пишется одной транзакцией.
+        limit = self.session.transaction_rows
+        written = 0
+        batches = iter(batches)
+        batch = next(batches, None)
+        while batch is not None:
+            with self.session.atomic():
+                committed = 0
+                while batch is not None and (not limit or committed < limit):
+                    started = time.perf_counter()
+                    committed += writer.write(batch)
+                    if times:
+                        times.write += time.perf_counter() - started
+                    self.guard.check()
+                    batch = next(batches, None)
+            written += committed
+        return written
+
+    def split_table(self, table: Table, model_cls: type[Model]) -> tuple[list[Partition], Optional[PKRange], int]:
+        pk_range = None
+        if self.reserve_pks and can_reserve(model_cls):
+            pk_range = reserve_range(model_cls, self.rows)
+            self.reserved.append(model_cls)
+        offset = self.get_offset(model_cls, pk_range)
+        # Зерно таблицы порождается в порядке планировщика, он одинаков при любом числе воркеров.
+        seed = self.seed_sequence.spawn(1)[0]
+        # С seed части нарезаются по размеру, а не по числу воркеров: их потоки не зависят от --workers.
+        parts = self.workers if self.seed is None else self.rows
+        if any(self.get_skewed(table, fields_set) for fields_set in table.unique_fk_sets):
+            # Счетчики пар у каждого родителя общие на всю таблицу, поэтому она пишется одной частью.
+            parts = 1
+        if self.writer == "raw" and not get_raw_writer(model_cls):
+            self.stdout.write(f"WARNING: {table.label} is not supported by the raw writer, using bulk_create.")
+        return split_rows(table.contenttype, self.rows, offset, pk_range, seed, parts), pk_range, offset
+
+    def fill_partition(self, partition: Partition) -> tuple[int, StageTimes]:
+
+        table = self.planner.tables[partition.contenttype]
+        model_cls = get_model(table.contenttype)
+        times = StageTimes()
+        started = time.perf_counter()
+        writer = self.get_writer(model_cls, include_pk=bool(partition.pk_range))
+        batches = writer.prepare(self.iter_values(table, model_cls, partition))
+        # Запись остается в текущем потоке: соединение и транзакция Django привязаны к нему.
+        batches = Pipeline(batches, self.pipeline_depth, times) if self.pipeline else timed(batches, times)
+        written = self.write(writer, batches, times)
+        times.elapsed = time.perf_counter() - started
+        return written, times
+
+    def finish_table(
+        self,
+        table: Table,
+        model_cls: type[Model],
+        pk_range: Optional[PKRange],
+        offset: int,
+        results: list[tuple[int, StageTimes]],
+        elapsed: float,
+    ) -> None:
+        # С зарезервированным диапазоном ключи детей считаются арифметикой, без повторного чтения родителя.
+        pool = pk_range or PKPool.load(model_cls)
+        self.pools[table.contenttype] = pool
+        self.created[table.contenttype] = pk_range or pool.after(offset)
+        written = sum(count for count, _ in results)
+        times = sum((partition_times for _, partition_times in results), StageTimes())
+        self.stdout.write(
+            f"{table.label}: {written} rows in {elapsed:.2f}s ({written / elapsed:.0f} rows/s; {times})"
+        )
+
+    def fill_layer(self, layer: tuple[Table, ...], executor: Optional[ProcessPoolExecutor] = None) -> None:
+
+        jobs = []
+        for table in layer:
+            started = time.perf_counter()
+            model_cls = get_model(table.contenttype)
+            partitions, pk_range, offset = self.split_table(table, model_cls)
+            if not executor:
+                results = [self.fill_partition(partition) for partition in partitions]
+                self.finish_table(table, model_cls, pk_range, offset, results, time.perf_counter() - started)
+                continue
+            pools = {r.target: self.pools[r.target] for r in table.fks if r.target in self.pools}
+            created = {r.target: self.created[r.target] for r in table.fks if r.target in self.created}
+            futures = [executor.submit(run_partition, partition, pools, created) for partition in partitions]
+            jobs.append((table, model_cls, pk_range, offset, futures, started))
+
+        # Результаты собираются в порядке таблиц и частей, а не в порядке завершения воркеров.
+        for table, model_cls, pk_range, offset, futures, started in jobs:
+            results = [future.result() for future in futures]
+            self.finish_table(table, model_cls, pk_range, offset, results, time.perf_counter() - started)
+
+    def start_workers(self) -> Optional[ProcessPoolExecutor]:
+
+        if self.workers <= 1:
+            return None
+        if connection.vendor == "sqlite":
+            self.stdout.write("WARNING: SQLite allows a single writer, filling in one process.")
+            return None
+        if "fork" not in multiprocessing.get_all_start_methods():
+            self.stdout.write("WARNING: process pool needs the fork start method, filling in one process.")
+            return None
+        executor = ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context("fork"), initializer=init_worker, initargs=(self,),
+        )
+        # С fork все воркеры запускаются разом на первой задаче. Соединения закрываются до этого,
+        # чтобы каждый процесс открыл свое, а не делил сокет родителя.
+        connections.close_all()
+        executor.submit(int).result()
+        return executor
+
+    def iter_links(
+        self,
+        through: type[Model],
+        columns: tuple[str, str],
+        sources: Union[PKPool, PKRange],
+        targets: Union[PKPool, PKRange],
+        fanout: Fanout,
+        distribution: Distribution,
+        rng: np.random.Generator,
+        symmetrical: bool = False,
+    ) -> Iterator[list[list]]:
+
+        source_attname, target_attname = columns
+        attnames = [field.attname for field in through._meta.concrete_fields]
+        position = 0
+        while position < len(sources):
+            size = min(max(self.guard.chunk_size // fanout.high, 1), len(sources) - position)
+            counts = np.minimum(fanout.sample(size, rng), len(targets))
+            source_ids = np.repeat(sources.take(np.arange(position, position + size)), counts).tolist()
+            target_ids = targets.take(distinct_links(counts, len(targets), distribution, rng)).tolist()
+            position += size
+            if symmetrical:
+                # Симметричная связь модели с собой хранится в обе стороны, как ее записывает add().
+                source_ids, target_ids = source_ids + target_ids, target_ids + source_ids
+            values = {source_attname: source_ids, target_attname: target_ids}
+            yield [values.get(attname) or [None] * len(source_ids) for attname in attnames]
+
+    def fill_mtm(self, table: Table, relation: Relation) -> None:
+
+        field = get_model(table.contenttype)._meta.get_field(relation.attname)
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            # Явная through-модель заполняется как обычная таблица со своими fk.
+            return
+        sources = self.created.get(table.contenttype, ())
+        targets = self.pools.get(relation.target) or PKPool.load(get_model(relation.target))
+        # Без настройки в 'relations' у каждой строки m2m_fanout связей с равномерно выбранными целями.
+        configured = self.distributions.get(table.contenttype, relation.attname)
+        distribution = configured.distribution if configured else Distribution()
+        fanout = configured.fanout if configured and configured.fanout else Fanout(self.m2m_fanout, self.m2m_fanout)
+        if not len(sources) or not min(fanout.high, len(targets)):
+            return
+
+        started = time.perf_counter()
+        rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+        columns = (
+            through._meta.get_field(field.m2m_field_name()).attname,
+            through._meta.get_field(field.m2m_reverse_field_name()).attname,
+        )
+        # Пары различны внутри запуска; у симметричной связи a -> b и b -> a могут совпасть, их отсекает база.
+        symmetrical = field.remote_field.symmetrical and relation.target == table.contenttype
+        writer = self.get_writer(through, include_pk=False, ignore_conflicts=symmetrical)
+        links = self.iter_links(through, columns, sources, targets, fanout, distribution, rng, symmetrical)
+        written = self.write(writer, writer.prepare(links))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{table.label}.{relation.attname}: {written} links in {elapsed:.2f}s ({written / elapsed:.0f} links/s)"
+        )
+
+    def get_target_models(self) -> list[type[Model]]:
+
+        models = [get_model(table.contenttype) for layer in self.planner.layers for table in layer]
+        for table, relation in self.planner.mtms:
+            field = get_model(table.contenttype)._meta.get_field(relation.attname)
+            # Симметричная связь полагается на уникальный индекс: зеркальные пары отсекает база.
+            symmetrical = field.remote_field.symmetrical and relation.target == table.contenttype
+            if field.remote_field.through._meta.auto_created and not symmetrical:
+                models.append(field.remote_field.through)
+        return models
+
+    def compile(self) -> None:
+        self.compiled = self.registry.compile_schema(self.schema)
+        self.distributions.compile(self.planner)
+
+    def fill(self) -> None:
+        # Все генераторы собираются до первой вставки, неизвестный тип поля не оборвет заполнение на середине.
+        self.compile()
+        self.registry.media.prepare()
+        executor = self.start_workers()
+        try:
+            with self.session, IndexRebuilder(self.get_target_models(), self.rebuild_indexes, self.reserve_pks):
+                for layer in self.planner.layers:
+                    self.fill_layer(layer, executor)
+                for table, relation in self.planner.mtms:
+                    self.fill_mtm(table, relation)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            reset_sequences(self.reserved)
+
+
+_worker_engine: Optional[FillEngine] = None
+
+
+def init_worker(engine: FillEngine) -> None:
+    # Воркер получает копию движка родителя через fork: генераторы уже скомпилированы.
+    global _worker_engine
+    _worker_engine = engine
+
+
+def run_partition(
+    partition: Partition,
+    pools: dict[ContentTypeRef, Union[PKPool, PKRange]],
+    created: dict[ContentTypeRef, Union[PKPool, PKRange]],
+) -> tuple[int, StageTimes]:
+    _worker_engine.pools.update(pools)
+    _worker_engine.created.update(created)
+    return _worker_engine.fill_partition(partition)
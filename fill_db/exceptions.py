@@ -3,4 +3,28 @@ class ConflictRelationError(Exception):
 
 
 class IOWrapperDoesNotSet(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class SchemaCacheError(Exception):
+    pass
+
+
+class CyclicRelationError(Exception):
+    pass
+
+
+class UnknownFieldError(Exception):
+    pass
+
+
+class UniqueCapacityError(Exception):
+    pass
+
+
+class UnsatisfiableFieldError(Exception):
+    pass
+
+
+class IndexRebuildError(Exception):
+    pass
@@ -0,0 +1,348 @@
+import ipaddress
+import math
+import operator
+import string
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from itertools import repeat
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+from django.conf import settings as django_settings
+from django.db import connection
+from django.db.models import Field as ModelField
+from django.utils import timezone
+
+from .corpus import ALPHABETS, TEXT_ALPHABETS, get_corpus
+from .exceptions import UniqueCapacityError, UnsatisfiableFieldError
+
+
+# Генератор получает поле, размер пачки и numpy rng и возвращает сразу всю колонку.
+Generator = Callable[[ModelField, int, np.random.Generator], Sequence[Any]]
+# Уникальный генератор дополнительно получает номер первой строки пачки и строит значения из счетчика.
+UniqueGenerator = Callable[[ModelField, int, np.random.Generator, int], Sequence[Any]]
+
+DEFAULT_STRING_LENGTH = 12
+TEXT_LENGTH = 120
+MAX_INTEGER = 10 ** 6
+DATE_SPREAD_DAYS = 365
+UNIQUE_SUFFIX_LENGTH = 6
+UNIQUE_EPOCH = datetime(2000, 1, 1)
+# Точка отсчета дат в заполнении с seed: от текущего времени зависел бы результат.
+SEEDED_NOW = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def random_strings(rng: np.random.Generator, size: int, length: int, alphabet: str = string.ascii_letters) -> list[str]:
+    return get_corpus(alphabet).cut(rng, size, length, length)
+
+
+def encode_counter(value: int, alphabet: str) -> str:
+    # divmod отрицательного числа не доходит до нуля, цикл стал бы бесконечным.
+    if value < 0:
+        raise ValueError(f"counter must be non-negative, got {value}")
+    base = len(alphabet)
+    digits = []
+    while True:
+        value, digit = divmod(value, base)
+        digits.append(alphabet[digit])
+        if not value:
+            return "".join(reversed(digits))
+
+
+def check_capacity(field: ModelField, last: int, capacity: int) -> None:
+    if last >= capacity:
+        raise UniqueCapacityError(
+            f"Field {field.model._meta.label_lower}.{field.name} can hold only {capacity} distinct values"
+        )
+
+
+def unique_strings(
+    field: ModelField, rng: np.random.Generator, size: int, start: int, length: int, alphabet: str,
+) -> list[str]:
+    # Случайная голова постоянной длины и счетчик без ведущих нулей: разные счетчики всегда дают разные строки,
+    # в том числе между запусками, потому что длина головы зависит только от поля.
+    head_length = max(length - UNIQUE_SUFFIX_LENGTH, 0)
+    check_capacity(field, start + size - 1, len(alphabet) ** (length - head_length))
+    suffixes = [encode_counter(counter, alphabet) for counter in range(start, start + size)]
+    return list(map(operator.add, random_strings(rng, size, head_length, alphabet), suffixes))
+
+
+def value_range(
+    field: ModelField, low: float, high: float, db_low: float = -math.inf, db_high: float = math.inf,
+) -> tuple[float, float]:
+    # Min/MaxValueValidator (атрибуты FieldView) сужают диапазон по умолчанию; если пересечения нет,
+    # диапазон той же ширины сдвигается к границе валидатора.
+    span = high - low
+    min_value = getattr(field, "min_value", None)
+    max_value = getattr(field, "max_value", None)
+    if min_value is not None and min_value > low:
+        low = min_value
+        high = max(high, low + span) if low > high else high
+    if max_value is not None and max_value < high:
+        high = max_value
+        if high < low:
+            low = high - span if min_value is None else max(min_value, high - span)
+    low, high = max(low, db_low), min(high, db_high)
+    if low > high:
+        raise UnsatisfiableFieldError(f"Field {field.model._meta.label_lower}.{field.name} has no valid values")
+    return low, high
+
+
+def integer_range(field: ModelField, high: float = MAX_INTEGER) -> tuple[int, int]:
+    db_low, db_high = connection.ops.integer_field_ranges[field.get_internal_type()]
+    low, high = value_range(field, 1, high, db_low, db_high)
+    return math.ceil(low), math.floor(high)
+
+
+def decimal_range(field: ModelField, high: float) -> tuple[int, int]:
+    # Диапазон в единицах последнего знака после запятой.
+    scale = 10 ** field.decimal_places
+    limit = (10 ** field.max_digits - 1) / scale
+    low, high = value_range(field, 0, high / scale, -limit, limit)
+    return math.ceil(low * scale), math.floor(high * scale)
+
+
+def string_length(field: ModelField, default: int = DEFAULT_STRING_LENGTH) -> int:
+    return max(min(field.max_length or default, default), getattr(field, "min_length", None) or 0)
+
+
+def generate_char(
+    field: ModelField, size: int, rng: np.random.Generator, alphabet: str = ALPHABETS["latin"],
+) -> list[str]:
+    return random_strings(rng, size, string_length(field), alphabet)
+
+
+def generate_slug(field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+    return random_strings(rng, size, string_length(field), string.ascii_lowercase + string.digits)
+
+
+def generate_text(
+    field: ModelField, size: int, rng: np.random.Generator, alphabet: str = TEXT_ALPHABETS["latin"],
+) -> list[str]:
+    # Слова разной длины из общего буфера; длина значения от половины до предела поля.
+    high = string_length(field, TEXT_LENGTH)
+    low = max(high // 2, getattr(field, "min_length", None) or 0)
+    return get_corpus(alphabet, words=True).cut(rng, size, low, high)
+
+
+def generate_email(field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+    domain = "@example.com"
+    length = min((field.max_length or DEFAULT_STRING_LENGTH) - len(domain), DEFAULT_STRING_LENGTH)
+    return [local + domain for local in random_strings(rng, size, length, string.ascii_lowercase)]
+
+
+def generate_url(field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+    paths = random_strings(rng, size, DEFAULT_STRING_LENGTH, string.ascii_lowercase)
+    return ["https://example.com/" + path for path in paths]
+
+
+def generate_integer(field: ModelField, size: int, rng: np.random.Generator) -> list[int]:
+    low, high = integer_range(field)
+    return rng.integers(low, high, size, endpoint=True).tolist()
+
+
+def generate_float(field: ModelField, size: int, rng: np.random.Generator) -> list[float]:
+    return rng.uniform(*value_range(field, 0, MAX_INTEGER), size).tolist()
+
+
+def generate_decimal(field: ModelField, size: int, rng: np.random.Generator) -> list[Decimal]:
+    low, high = decimal_range(field, 10 ** min(field.max_digits, 18) - 1)
+    values = rng.integers(low, high, size, endpoint=True).tolist()
+    return [Decimal(value).scaleb(-field.decimal_places) for value in values]
+
+
+def generate_boolean(field: ModelField, size: int, rng: np.random.Generator) -> list[bool]:
+    return (rng.random(size) < 0.5).tolist()
+
+
+def generate_datetime(
+    field: ModelField, size: int, rng: np.random.Generator, now: Optional[datetime] = None,
+) -> list[datetime]:
+    timestamps = ((now or timezone.now()).timestamp() - rng.uniform(0, DATE_SPREAD_DAYS * 24 * 3600, size)).tolist()
+    tz = dt_timezone.utc if django_settings.USE_TZ else None
+    return list(map(datetime.fromtimestamp, timestamps, repeat(tz, size)))
+
+
+def generate_date(
+    field: ModelField, size: int, rng: np.random.Generator, now: Optional[datetime] = None,
+) -> list[date]:
+    today = np.datetime64(now.date() if now else date.today(), "D")
+    return (today - rng.integers(0, DATE_SPREAD_DAYS, size).astype("timedelta64[D]")).tolist()
+
+
+def generate_time(field: ModelField, size: int, rng: np.random.Generator) -> list[time]:
+    seconds = rng.integers(0, 24 * 3600, size).tolist()
+    return [time(s // 3600, s // 60 % 60, s % 60) for s in seconds]
+
+
+def generate_duration(field: ModelField, size: int, rng: np.random.Generator) -> list[timedelta]:
+    return rng.integers(0, 24 * 3600, size).astype("timedelta64[s]").tolist()
+
+
+def generate_uuid(field: ModelField, size: int, rng: np.random.Generator) -> list[uuid.UUID]:
+    raw = rng.bytes(16 * size)
+    return [uuid.UUID(bytes=raw[i:i + 16], version=4) for i in range(0, 16 * size, 16)]
+
+
+def generate_ip(field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+    return [".".join(map(str, octets)) for octets in rng.integers(1, 255, (size, 4)).tolist()]
+
+
+def generate_json(field: ModelField, size: int, rng: np.random.Generator) -> list[dict]:
+    return [{} for _ in range(size)]
+
+
+def generate_binary(field: ModelField, size: int, rng: np.random.Generator) -> list[bytes]:
+    raw = rng.bytes(DEFAULT_STRING_LENGTH * size)
+    return [raw[i:i + DEFAULT_STRING_LENGTH] for i in range(0, len(raw), DEFAULT_STRING_LENGTH)]
+
+
+FIELD_GENERATORS: dict[str, Generator] = {
+    "CharField": generate_char,
+    "SlugField": generate_slug,
+    "TextField": generate_text,
+    "EmailField": generate_email,
+    "URLField": generate_url,
+    "IntegerField": generate_integer,
+    "SmallIntegerField": generate_integer,
+    "BigIntegerField": generate_integer,
+    "PositiveIntegerField": generate_integer,
+    "PositiveSmallIntegerField": generate_integer,
+    "PositiveBigIntegerField": generate_integer,
+    "FloatField": generate_float,
+    "DecimalField": generate_decimal,
+    "BooleanField": generate_boolean,
+    "NullBooleanField": generate_boolean,
+    "DateTimeField": generate_datetime,
+    "DateField": generate_date,
+    "TimeField": generate_time,
+    "DurationField": generate_duration,
+    "UUIDField": generate_uuid,
+    "GenericIPAddressField": generate_ip,
+    "JSONField": generate_json,
+    "BinaryField": generate_binary,
+}
+
+
+def generate_choice(field: ModelField, size: int, rng: np.random.Generator) -> list:
+    values = [value for value, _ in field.flatchoices]
+    return [values[i] for i in rng.integers(0, len(values), size).tolist()]
+
+
+def generate_unique_char(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    return unique_strings(field, rng, size, start, string_length(field), string.ascii_letters)
+
+
+def generate_unique_slug(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    return unique_strings(field, rng, size, start, string_length(field), string.ascii_lowercase + string.digits)
+
+
+def generate_unique_text(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    return unique_strings(field, rng, size, start, string_length(field, TEXT_LENGTH), string.ascii_lowercase)
+
+
+def generate_unique_email(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    domain = "@example.com"
+    length = min((field.max_length or DEFAULT_STRING_LENGTH) - len(domain), DEFAULT_STRING_LENGTH)
+    return [local + domain for local in unique_strings(field, rng, size, start, length, string.ascii_lowercase)]
+
+
+def generate_unique_url(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    paths = unique_strings(field, rng, size, start, DEFAULT_STRING_LENGTH, string.ascii_lowercase)
+    return ["https://example.com/" + path for path in paths]
+
+
+def generate_unique_integer(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[int]:
+    low, high = integer_range(field, math.inf)
+    check_capacity(field, start + size - 1, high - low + 1)
+    return list(range(low + start, low + start + size))
+
+
+def generate_unique_float(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[float]:
+    low, high = value_range(field, 0, math.inf)
+    check_capacity(field, start + size - 1, high - low + 1)
+    return [float(low + counter) for counter in range(start, start + size)]
+
+
+def generate_unique_decimal(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[Decimal]:
+    low, high = decimal_range(field, math.inf)
+    check_capacity(field, start + size - 1, high - low + 1)
+    return [Decimal(low + counter).scaleb(-field.decimal_places) for counter in range(start, start + size)]
+
+
+def generate_unique_boolean(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[bool]:
+    check_capacity(field, start + size - 1, 2)
+    return [bool(counter) for counter in range(start, start + size)]
+
+
+def generate_unique_datetime(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[datetime]:
+    epoch = UNIQUE_EPOCH.replace(tzinfo=dt_timezone.utc) if django_settings.USE_TZ else UNIQUE_EPOCH
+    return [epoch + timedelta(seconds=counter) for counter in range(start, start + size)]
+
+
+def generate_unique_date(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[date]:
+    epoch = UNIQUE_EPOCH.date()
+    check_capacity(field, start + size - 1, (date.max - epoch).days)
+    return [epoch + timedelta(days=counter) for counter in range(start, start + size)]
+
+
+def generate_unique_time(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[time]:
+    check_capacity(field, start + size - 1, 24 * 3600)
+    return [time(s // 3600, s // 60 % 60, s % 60) for s in range(start, start + size)]
+
+
+def generate_unique_duration(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[timedelta]:
+    return [timedelta(seconds=counter) for counter in range(start, start + size)]
+
+
+def generate_unique_uuid(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[uuid.UUID]:
+    # Номер строки в старших битах, случайный хвост в младших.
+    tails = rng.integers(0, 2 ** 63, size).tolist()
+    return [uuid.UUID(int=(counter << 64) | tail) for counter, tail in zip(range(start, start + size), tails)]
+
+
+def generate_unique_ip(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+    check_capacity(field, start + size - 1, 2 ** 32 - 2)
+    return [str(ipaddress.IPv4Address(counter + 1)) for counter in range(start, start + size)]
+
+
+def generate_unique_json(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[dict]:
+    return [{"n": counter} for counter in range(start, start + size)]
+
+
+def generate_unique_binary(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[bytes]:
+    return [counter.to_bytes(8, "big") for counter in range(start, start + size)]
+
+
+def generate_unique_choice(field: ModelField, size: int, rng: np.random.Generator, start: int) -> list:
+    values = [value for value, _ in field.flatchoices]
+    check_capacity(field, start + size - 1, len(values))
+    return values[start:start + size]
+
+
+UNIQUE_FIELD_GENERATORS: dict[str, UniqueGenerator] = {
+    "CharField": generate_unique_char,
+    "SlugField": generate_unique_slug,
+    "TextField": generate_unique_text,
+    "EmailField": generate_unique_email,
+    "URLField": generate_unique_url,
+    "IntegerField": generate_unique_integer,
+    "SmallIntegerField": generate_unique_integer,
+    "BigIntegerField": generate_unique_integer,
+    "PositiveIntegerField": generate_unique_integer,
+    "PositiveSmallIntegerField": generate_unique_integer,
+    "PositiveBigIntegerField": generate_unique_integer,
+    "FloatField": generate_unique_float,
+    "DecimalField": generate_unique_decimal,
+    "BooleanField": generate_unique_boolean,
+    "NullBooleanField": generate_unique_boolean,
+    "DateTimeField": generate_unique_datetime,
+    "DateField": generate_unique_date,
+    "TimeField": generate_unique_time,
+    "DurationField": generate_unique_duration,
+    "UUIDField": generate_unique_uuid,
+    "GenericIPAddressField": generate_unique_ip,
+    "JSONField": generate_unique_json,
+    "BinaryField": generate_unique_binary,
+}
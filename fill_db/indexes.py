@@ -0,0 +1,241 @@
+import copy
+import time
+from functools import partial
+from typing import Callable, Optional, Union
+
+from django.apps.registry import Apps
+from django.db import DatabaseError, connection, transaction
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import Index, Model, UniqueConstraint
+
+from .exceptions import IndexRebuildError
+from .handers import MessageHandler
+
+
+IndexLike = Union[Index, UniqueConstraint]
+
+
+def get_db_constraints(model_cls: type[Model]) -> dict[str, dict]:
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, model_cls._meta.db_table)
+
+
+def find_name(db_constraints: dict[str, dict], columns: list[str], unique: bool) -> Optional[str]:
+    # Имя берется из базы: индексы могли быть созданы миграциями под другим именем.
+    for name, info in db_constraints.items():
+        if info["primary_key"] or info["foreign_key"] or info["check"] or name.endswith("_like"):
+            continue
+        if info["columns"] == columns and info["unique"] == unique and (unique or info["index"]):
+            return name
+    return None
+
+
+def get_label(item: IndexLike, model_cls: type[Model]) -> str:
+    # У ограничений UNIQUE из описания таблицы SQLite нет имени.
+    if item.name.startswith("__"):
+        return f"{model_cls._meta.db_table} unique ({', '.join(item.fields)})"
+    return f"{model_cls._meta.db_table}.{item.name}"
+
+
+def is_table_unique(item: IndexLike) -> bool:
+    # В SQLite такие ограничения входят в CREATE TABLE и меняются только пересозданием таблицы.
+    return connection.vendor == "sqlite" and isinstance(item, UniqueConstraint) and not item.condition
+
+
+def table_variant(model_cls: type[Model], uniques: bool) -> type[Model]:
+    # Копия модели в отдельном реестре без индексов (и без уникальности, если uniques=False), как в _remake_table.
+    # Базой служит Model: m2m абстрактных родителей создали бы в новом реестре лишние through-таблицы.
+    meta = model_cls._meta
+    with connection.cursor() as cursor:
+        order = [column.name for column in connection.introspection.get_table_description(cursor, meta.db_table)]
+    # Колонки в порядке таблицы: пересоздание не должно менять ее описание.
+    fields = sorted(
+        meta.local_concrete_fields, key=lambda f: order.index(f.column) if f.column in order else len(order),
+    )
+    body = {}
+    for position, field in enumerate(fields):
+        is_self_referential = field.is_relation and field.remote_field.model is model_cls
+        field = field.clone() if is_self_referential else copy.deepcopy(field)
+        # Порядок полей модели задает creation_counter, а не порядок в описании класса.
+        field.creation_counter = position
+        if not field.primary_key:
+            field.db_index = False
+            field._unique = field._unique and uniques
+        body[field.name] = field
+    body["Meta"] = type("Meta", (), {
+        "app_label": meta.app_label,
+        "db_table": meta.db_table,
+        "apps": Apps(),
+        "unique_together": meta.unique_together if uniques else (),
+        "index_together": (),
+        "indexes": [],
+        "constraints": [
+            constraint for constraint in meta.constraints
+            if not isinstance(constraint, UniqueConstraint) or uniques and not constraint.condition
+        ],
+    })
+    body["__module__"] = model_cls.__module__
+    return type(meta.object_name, (Model,), body)
+
+
+def remove_item(editor: BaseDatabaseSchemaEditor, model: type[Model], item: IndexLike) -> None:
+    if isinstance(item, Index):
+        editor.remove_index(model, item)
+    else:
+        editor.remove_constraint(model, item)
+
+
+def add_item(editor: BaseDatabaseSchemaEditor, model: type[Model], item: IndexLike) -> None:
+    if isinstance(item, Index):
+        editor.add_index(model, item)
+    else:
+        editor.add_constraint(model, item)
+
+
+class TableIndexes:
+
+    __slots__ = ("model_cls", "indexes", "uniques")
+
+    def __init__(self, model_cls: type[Model], indexes: list[Index], uniques: list[UniqueConstraint]):
+        self.model_cls = model_cls
+        self.indexes = indexes
+        self.uniques = uniques
+
+    @classmethod
+    def collect(cls, model_cls: type[Model]) -> "TableIndexes":
+
+        meta = model_cls._meta
+        db_constraints = get_db_constraints(model_cls)
+        indexes = [index for index in meta.indexes if index.name in db_constraints]
+        uniques = [
+            constraint for constraint in meta.constraints
+            if isinstance(constraint, UniqueConstraint) and constraint.name in db_constraints
+        ]
+        field_sets = [
+            ((field.name,), field.unique)
+            for field in meta.local_concrete_fields
+            if not field.primary_key and (field.unique or field.db_index)
+        ]
+        field_sets += [(names, True) for names in meta.unique_together]
+        field_sets += [(names, False) for names in meta.index_together]
+        for names, unique in field_sets:
+            columns = [meta.get_field(name).column for name in names]
+            if not (name := find_name(db_constraints, columns, unique)):
+                continue
+            if unique:
+                uniques.append(UniqueConstraint(fields=list(names), name=name))
+            else:
+                indexes.append(Index(fields=list(names), name=name))
+        return cls(model_cls, indexes, uniques)
+
+    @property
+    def table_uniques(self) -> list[UniqueConstraint]:
+        return [constraint for constraint in self.uniques if is_table_unique(constraint)]
+
+    @property
+    def separate(self) -> list[IndexLike]:
+        return [constraint for constraint in self.uniques if not is_table_unique(constraint)] + self.indexes
+
+    def __len__(self):
+        return len(self.indexes) + len(self.uniques)
+
+
+class IndexRebuilder(MessageHandler):
+    """
+    Drops the non-PK indexes and unique constraints of the filled tables
+    before the fill and recreates them afterwards, even if the fill fails.
+    Foreign key and check constraints are kept. Unique constraints are
+    dropped only if the fill guarantees distinct values (drop_uniques).
+    """
+
+    def __init__(self, models: list[type[Model]], enabled: bool = False, drop_uniques: bool = False):
+        self.models = models
+        self.enabled = enabled
+        self.drop_uniques = drop_uniques
+        self.dropped: list[TableIndexes] = []
+
+    def __enter__(self) -> "IndexRebuilder":
+        if self.enabled:
+            self.drop()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.dropped:
+            self.rebuild()
+
+    def drop(self) -> None:
+
+        started = time.perf_counter()
+        if not self.drop_uniques:
+            # Данные, которые нарушили бы ограничение, уже не вернуть в уникальный индекс: таблица осталась бы без него.
+            self.stdout.write(
+                "WARNING: unique constraints are kept, "
+                "only --reserve-pks guarantees values distinct from existing rows."
+            )
+        tables = []
+        for model_cls in self.models:
+            meta = model_cls._meta
+            if not meta.managed or meta.proxy or meta.parents:
+                self.stdout.write(f"WARNING: indexes of {meta.label_lower} are kept, the table is not rebuilt.")
+                continue
+            table = TableIndexes.collect(model_cls)
+            if not self.drop_uniques:
+                table.uniques = []
+            if table:
+                tables.append(table)
+        # Один редактор на все таблицы: при ошибке откатываются все удаления, а проверка fk SQLite идет один раз.
+        with connection.schema_editor() as editor:
+            for table in tables:
+                for item in table.separate:
+                    remove_item(editor, table.model_cls, item)
+                if table.table_uniques:
+                    # Одно пересоздание таблицы без ограничений UNIQUE вместо отдельного на каждое.
+                    remove_item(editor, table_variant(table.model_cls, uniques=False), table.table_uniques[0])
+        self.dropped = tables
+        self.stdout.write(
+            f"Dropped {sum(map(len, tables))} indexes and unique constraints of {len(tables)} tables "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+
+    def get_actions(self, table: TableIndexes) -> list[tuple[str, Callable[[BaseDatabaseSchemaEditor], None]]]:
+
+        # Сначала уникальность: пересоздание таблицы SQLite не должно перестраивать уже восстановленные индексы.
+        model_cls = table.model_cls
+        actions = []
+        if table_uniques := table.table_uniques:
+            actions.append((
+                f"{model_cls._meta.db_table} unique constraints ({len(table_uniques)}, table rebuild)",
+                partial(add_item, model=table_variant(model_cls, uniques=True), item=table_uniques[0]),
+            ))
+        actions += [(get_label(item, model_cls), partial(add_item, model=model_cls, item=item)) for item in table.separate]
+        return actions
+
+    def rebuild(self) -> None:
+
+        failed = []
+        started = time.perf_counter()
+        with connection.schema_editor() as editor:
+            for table in self.dropped:
+                for label, action in self.get_actions(table):
+                    item_started = time.perf_counter()
+                    pending = len(editor.deferred_sql)
+                    try:
+                        # Точка сохранения: неудачный индекс (дубликаты в данных) не откатывает остальные.
+                        with transaction.atomic():
+                            action(editor)
+                    except DatabaseError as error:
+                        # Отложенные запросы откатившегося пересоздания таблицы выполнять уже нельзя.
+                        del editor.deferred_sql[pending:]
+                        self.stdout.write(f"ERROR: {label} was not rebuilt: {error}")
+                        failed.append(label)
+                        continue
+                    self.stdout.write(f"{label}: rebuilt in {time.perf_counter() - item_started:.2f}s")
+            checked = time.perf_counter()
+        finished = time.perf_counter()
+        self.stdout.write(
+            f"Indexes rebuilt in {finished - started:.2f}s, "
+            f"including {finished - checked:.2f}s of the final constraint check and commit"
+        )
+        self.dropped = []
+        if failed:
+            raise IndexRebuildError(f"Indexes were not rebuilt, fix the data and create them again: {', '.join(failed)}")
@@ -1,20 +1,143 @@
+from typing import Optional
+
 from django.core.management.base import BaseCommand, CommandError
 
-from fill_db.parser import Parser
+from fill_db.checksum import Checksum
+from fill_db.engine import FillEngine
+from fill_db.generators import SEEDED_NOW
 from fill_db.handers import MessageHandler
+from fill_db.media import MediaPool
+from fill_db.memory import parse_size
+from fill_db.parser import Parser
+from fill_db.planner import Planner
+from fill_db.registry import GeneratorRegistry
+from fill_db.schema import Schema
+from fill_db.users import UserStrategy, seeded_salt
 
 
 class Command(BaseCommand):
     help = 'Generated django model objects.'
 
     def add_arguments(self, parser):
-        parser.add_argument("init", type=bool)
+        parser.add_argument("action", choices=["init", "plan", "fill", "checksum"])
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Key relations by app_label.model_name instead of ContentType ids, no database needed.",
+        )
+        parser.add_argument("--rows", type=int, default=10, help="Rows to generate per table.")
+        parser.add_argument("--batch-size", type=int, help="Rows per bulk_create batch.")
+        parser.add_argument(
+            "--max-memory",
+            type=parse_size,
+            help="Resident memory limit (e.g. 512M, 2G); the batch size shrinks when it is exceeded.",
+        )
+        parser.add_argument(
+            "--reserve-pks",
+            action="store_true",
+            help="Assign explicit primary keys from a reserved range instead of reading generated ids back.",
+        )
+        parser.add_argument("--m2m-fanout", type=int, help="Distinct many-to-many links per generated row.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processes filling the tables of one layer, or reserved pk ranges of one table, in parallel.",
+        )
+        parser.add_argument(
+            "--pipeline",
+            action="store_true",
+            help="Generate the next batches in a background thread while the current one is written.",
+        )
+        parser.add_argument(
+            "--writer",
+            choices=["orm", "raw"],
+            help="'raw' streams batches with executemany (SQLite) or COPY (PostgreSQL), falling back to bulk_create.",
+        )
+        parser.add_argument(
+            "--bulk-session",
+            action="store_true",
+            help="Relax durability settings for the fill (SQLite pragmas, PostgreSQL synchronous_commit and "
+            "deferred constraints) and commit every --transaction-rows rows; a failed fill keeps committed rows.",
+        )
+        parser.add_argument("--transaction-rows", type=int, help="Rows per transaction in the bulk-load session.")
+        parser.add_argument(
+            "--rebuild-indexes",
+            action="store_true",
+            help="Drop non-PK indexes of the filled tables and recreate them after the fill; unique constraints "
+            "are dropped too with --reserve-pks.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Make the fill reproducible: the same seed gives the same rows with any number of workers.",
+        )
+
+    @staticmethod
+    def get_registry(config: dict, seed: Optional[int] = None) -> GeneratorRegistry:
+        seeded = seed is not None
+        return GeneratorRegistry(
+            config["generators"],
+            config["unique_generators"],
+            UserStrategy(config["user_password"], config["user_password_hasher"], seeded_salt(seed) if seeded else None),
+            MediaPool(
+                config["media_pool_size"],
+                config["media_image_size"],
+                config["media_file_size"],
+                config["media_distinct"],
+                config["media_threads"],
+            ),
+            config["text_alphabet"],
+            SEEDED_NOW if seeded else None,
+        )
+
+    def load_fresh_schema(self, parser: Parser) -> Schema:
+        # plan и fill работают по актуальной схеме: устаревшие таблицы разбираются заново.
+        schema = parser.load_schema()
+        if stale := parser.stale_tables(schema):
+            self.stdout.write(f"Schema cache is stale for: {', '.join(stale)}")
+            schema = parser.parse(schema)
+        return schema
 
     def handle(self, *args, **options):
 
         MessageHandler._stdout = self.stdout
-        parser = Parser()
+        parser = Parser(offline=options["offline"])
 
-        if options.get("init"):
+        if options["action"] == "init":
             parser.parse()
-        
+
+        elif options["action"] == "plan":
+            schema = self.load_fresh_schema(parser)
+            self.get_registry(parser.config).compile_schema(schema)
+            Planner(schema).dry_run()
+
+        elif options["action"] == "fill":
+            if options["rows"] < 1:
+                raise CommandError("--rows must be a positive number.")
+            schema = self.load_fresh_schema(parser)
+            seed = parser.config["seed"] if options["seed"] is None else options["seed"]
+            batch_size = options["batch_size"] or parser.config["batch_size"]
+            FillEngine(
+                schema,
+                rows=options["rows"],
+                batch_size=batch_size,
+                max_memory=options["max_memory"],
+                registry=self.get_registry(parser.config, seed),
+                reserve_pks=options["reserve_pks"] or parser.config["reserve_pks"],
+                m2m_fanout=parser.config["m2m_fanout"] if options["m2m_fanout"] is None else options["m2m_fanout"],
+                workers=options["workers"] or parser.config["workers"],
+                pipeline=options["pipeline"] or parser.config["pipeline"],
+                pipeline_depth=parser.config["pipeline_depth"],
+                writer=options["writer"] or parser.config["writer"],
+                bulk_session=options["bulk_session"] or parser.config["bulk_session"],
+                transaction_rows=options["transaction_rows"] or parser.config["transaction_rows"],
+                rebuild_indexes=options["rebuild_indexes"] or parser.config["rebuild_indexes"],
+                seed=seed,
+                relations=parser.config["relations"],
+            ).fill()
+
+        elif options["action"] == "checksum":
+            schema = parser.load_schema()
+            if not schema:
+                raise CommandError("Schema cache is empty, run 'init' first.")
+            Checksum(Planner(schema)).run()
@@ -0,0 +1,130 @@
+import hashlib
+import io
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db.models import Field as ModelField, ImageField
+
+from .handers import MessageHandler
+
+
+IMAGE_GRID = 4
+DIGEST_LENGTH = 32
+
+
+def field_label(field: ModelField) -> str:
+    return f"{field.model._meta.label_lower}.{field.name}"
+
+
+def field_seed(field: ModelField) -> int:
+    return zlib.crc32(field_label(field).encode())
+
+
+def render_image(rng: np.random.Generator, size: int) -> bytes:
+    from PIL import Image
+
+    # Сетка случайных цветов, растянутая до размера картинки: файлы различны, но хорошо сжимаются.
+    cell = -(-size // IMAGE_GRID)
+    grid = rng.integers(0, 256, (IMAGE_GRID, IMAGE_GRID, 3), dtype=np.uint8)
+    pixels = np.repeat(np.repeat(grid, cell, axis=0), cell, axis=1)[:size, :size]
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, "RGB").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def render_file(rng: np.random.Generator, size: int) -> bytes:
+    return rng.bytes(size)
+
+
+class MediaPool(MessageHandler):
+    """
+    Real files for FileField / ImageField columns. A small pool of distinct
+    files is rendered once per field, stored under the field's storage with
+    content-addressed names and sampled by rows; the same pool content is
+    reused by later runs. In distinct mode every row gets its own file,
+    written from a thread pool.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 8,
+        image_size: int = 64,
+        file_size: int = 1024,
+        distinct: bool = False,
+        threads: int = 4,
+    ):
+        assert pool_size > 0, "'media_pool_size' in config must be positive"
+        self.pool_size = pool_size
+        self.image_size = image_size
+        self.file_size = file_size
+        self.distinct = distinct
+        self.threads = threads
+        self.fields: dict[str, ModelField] = {}
+        self.pools: dict[str, np.ndarray] = {}
+
+    def render(self, field: ModelField, rng: np.random.Generator) -> tuple[bytes, str]:
+        if isinstance(field, ImageField):
+            return render_image(rng, self.image_size), ".png"
+        return render_file(rng, self.file_size), ".bin"
+
+    def store(self, field: ModelField, seed: list[int]) -> str:
+
+        content, extension = self.render(field, np.random.default_rng(seed))
+        upload_to = field.upload_to if isinstance(field.upload_to, str) else ""
+        name = f"{upload_to}{hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]}{extension}"
+        # Имя из содержимого: одинаковый файл записывается один раз, в том числе между запусками.
+        if field.storage.exists(name):
+            return name
+        return field.storage.save(name, ContentFile(content))
+
+    def get_pool(self, field: ModelField) -> np.ndarray:
+
+        label = field_label(field)
+        if label not in self.pools:
+            # Пул зависит только от поля: повторный запуск находит те же файлы и ничего не пишет.
+            seed = field_seed(field)
+            names = [self.store(field, [seed, i]) for i in range(self.pool_size)]
+            self.pools[label] = np.array(names, dtype=object)
+        return self.pools[label]
+
+    def check_storage(self) -> None:
+        # Без MEDIA_ROOT файловое хранилище пишет в текущую директорию, обычно рядом с manage.py.
+        for label, field in self.fields.items():
+            if isinstance(field.storage, FileSystemStorage) and not field.storage.base_location:
+                self.stdout.write(
+                    f"WARNING: MEDIA_ROOT is not set, files of {label} are written to the current directory."
+                )
+
+    def prepare(self) -> None:
+        self.check_storage()
+        # Пулы рендерятся до запуска воркеров, чтобы процессы не писали одни и те же файлы одновременно.
+        if self.distinct:
+            return
+        for field in self.fields.values():
+            self.get_pool(field)
+        if self.pools:
+            self.stdout.write(
+                f"Media pool: {sum(map(len, self.pools.values()))} files for {len(self.pools)} fields"
+            )
+
+    def store_many(self, field: ModelField, seeds: list[list[int]]) -> list[str]:
+        with ThreadPoolExecutor(self.threads) as executor:
+            return list(executor.map(self.store, [field] * len(seeds), seeds))
+
+    def generate(self, field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+        if self.distinct:
+            seeds = rng.integers(2 ** 63, size=size)
+            return self.store_many(field, [[field_seed(field), int(seed)] for seed in seeds])
+        pool = self.get_pool(field)
+        return pool[rng.integers(0, len(pool), size)].tolist()
+
+    def generate_unique(self, field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+        # Уникальному полю нужен свой файл на строку: содержимое зависит от счетчика, значит различны и имена.
+        seed = field_seed(field)
+        return self.store_many(field, [[seed, 1, counter] for counter in range(start, start + size)])
+
+    def register(self, field: ModelField) -> None:
+        self.fields[field_label(field)] = field
@@ -0,0 +1,51 @@
+import gc
+import os
+import re
+import sys
+from typing import Optional
+
+from .handers import MessageHandler
+
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+MIN_CHUNK_SIZE = 100
+
+
+def parse_size(value: str) -> int:
+    match = re.fullmatch(r"(\d+)\s*([KMG]?)B?", value.strip().upper())
+    if not match:
+        raise ValueError(f"Invalid memory size {value!r}, expected e.g. 512M or 2G")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def current_rss() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    # Без /proc остается только пиковое потребление, на macOS оно в байтах, на linux в килобайтах.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class MemoryGuard(MessageHandler):
+
+    def __init__(self, chunk_size: int, limit: Optional[int] = None):
+        self.chunk_size = chunk_size
+        self.limit = limit
+
+    def check(self) -> int:
+
+        if not self.limit or self.chunk_size <= MIN_CHUNK_SIZE or current_rss() <= self.limit:
+            return self.chunk_size
+
+        gc.collect()
+        if current_rss() > self.limit:
+            self.chunk_size = max(self.chunk_size // 2, MIN_CHUNK_SIZE)
+            self.stdout.write(f"WARNING: memory limit exceeded, chunk size reduced to {self.chunk_size}")
+        return self.chunk_size
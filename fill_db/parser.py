@@ -1,20 +1,30 @@
-import os
 import json
-from typing import Any
+import hashlib
+from typing import Any, Optional
 from collections import defaultdict
 
 from django.utils.functional import cached_property
 from django.apps import apps as django_apps
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Model
+from django.db.models import Model, UniqueConstraint
 
+from .cache import JsonSchemaCache, get_schema_cache
 from .config import Config
+from .contenttypes import ContentTypeRef
 from .exceptions import ConflictRelationError
 from .handers import MessageHandler
+from .schema import App, Field, Relation, Schema, Table, dump_schema, iter_tables, load_schema
+from .validators import describe_validators
+
+
+CACHE_VERSION = 4
 
 
 class Parser(MessageHandler):
 
+    def __init__(self, offline: bool = False):
+        self.offline = offline or bool(self.config["offline"])
+
     @cached_property
     def config(self) -> Config:
         return Config().using_conf
@@ -39,26 +49,42 @@ class Parser(MessageHandler):
             all_models[app] = tables
         return all_models
     
-    @staticmethod
-    def get_django_contenttype_id(model_cls: Model) -> int:
+    @cached_property
+    def contenttype_ids(self) -> dict[tuple[str, str], int]:
+
+        # У автоматических m2m-таблиц нет ContentType, get_for_models создал бы его в базе.
+        models = [
+            model_cls for tables in self.tables_to_parse.values()
+            for model_cls in tables.values() if not model_cls._meta.auto_created
+        ]
+        content_types = ContentType.objects.get_for_models(*models, for_concrete_models=False)
+        return {
+            (model_cls._meta.app_label, model_cls._meta.model_name): content_object.id
+            for model_cls, content_object in content_types.items()
+        }
+
+    def get_django_contenttype_id(self, model_cls: Model) -> int:
         model_meta = model_cls._meta
-        content_object = ContentType.objects.get(
-            app_label=model_meta.app_label,
-            model=model_meta.model_name,
-        )
-        return content_object.id
+        return self.contenttype_ids[(model_meta.app_label, model_meta.model_name)]
+
+    def get_relation_key(self, model_cls: Model) -> ContentTypeRef:
+        if self.offline:
+            return model_cls._meta.label_lower
+        return self.get_django_contenttype_id(model_cls)
     
     def get_fields(self, model_cls: Model) -> dict[str, Any]:
         meta = model_cls._meta
         fields = {
-            "simple": {}, "fk": {}, "mtm": {}, 
+            "fields": [], "fks": [], "mtms": [],
             "default_related_name": getattr(meta, "default_related_name", None),
             "model_name": model_cls.__name__,
         }
         for field in meta.concrete_fields:
 
             if not field.primary_key and not hasattr(field, 'through') and not field.related_model:
-                fields["simple"].update({field.attname: field.__class__.__name__})
+                fields["fields"].append(
+                    Field(field.attname, field.__class__.__name__, field.max_length, describe_validators(field))
+                )
 
             elif not field.primary_key and field.is_relation:
                 related_model_app_name = field.related_model._meta.app_label 
@@ -71,7 +97,7 @@ class Parser(MessageHandler):
                         f"Model {meta.model_name} have fk relation with "
                         f"excluded model {related_model_app_name}_{related_model_name}"
                     )
-                fields["fk"].update({field.attname: self.get_django_contenttype_id(field.related_model)})
+                fields["fks"].append(Relation(field.attname, self.get_relation_key(field.related_model)))
 
         for field in meta.many_to_many:
             related_model_app_name = field.related_model._meta.app_label 
@@ -87,41 +113,182 @@ class Parser(MessageHandler):
                         f"excluded model {related_model_app_name}_{related_model_name}. This relation will be ignored."
                     )
                 else:
-                    fields["mtm"].update(
-                        {
-                            field.attname: {
-                                "contenttype_id":self.get_django_contenttype_id(field.related_model),
-                                "related_name": field.related_query_name(),
-                            },
-                        }
+                    fields["mtms"].append(
+                        Relation(
+                            field.attname,
+                            self.get_relation_key(field.related_model),
+                            field.related_query_name(),
+                        )
                     )
+
+        fields["unique"] = self.get_unique_sets(model_cls)
         return fields
+
+    @staticmethod
+    def get_unique_sets(model_cls: Model) -> list[tuple[str, ...]]:
+        meta = model_cls._meta
+        unique_sets = [(field.attname,) for field in meta.concrete_fields if field.unique and not field.primary_key]
+        names_sets = [*meta.unique_together]
+        names_sets.extend(
+            constraint.fields for constraint in meta.constraints
+            if isinstance(constraint, UniqueConstraint) and constraint.fields
+        )
+        for names in names_sets:
+            fields_set = tuple(meta.get_field(name) for name in names)
+            if not any(field.primary_key for field in fields_set):
+                unique_sets.append(tuple(field.attname for field in fields_set))
+        return list(dict.fromkeys(unique_sets))
     
-    def create_tables_map(self) -> dict[str, defaultdict[str, dict[str, Any]]]:
+    def get_fingerprint(self, model_cls: Model) -> str:
+        meta = model_cls._meta
+        fields = []
+        for field in (*meta.concrete_fields, *meta.many_to_many):
+            related_label = None
+            if field.related_model:
+                related_meta = field.related_model._meta
+                related_label = (
+                    related_meta.label_lower,
+                    related_meta.model_name in self.tables_to_parse.get(related_meta.app_label, {}),
+                )
+            fields.append(
+                (
+                    field.attname, field.__class__.__name__, related_label, field.primary_key, field.unique,
+                    field.null, field.max_length, describe_validators(field),
+                )
+            )
+        descriptor = {
+            "version": CACHE_VERSION,
+            "default_related_name": meta.default_related_name,
+            "fields": fields,
+            "unique_together": [list(fields_set) for fields_set in meta.unique_together],
+            "constraints": [
+                (constraint.__class__.__name__, constraint.name, list(getattr(constraint, "fields", ())))
+                for constraint in meta.constraints
+            ],
+        }
+        return hashlib.sha1(json.dumps(descriptor, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def get_related_models(model_cls: Model) -> dict[str, type[Model]]:
+        meta = model_cls._meta
+        return {
+            field.attname: field.related_model
+            for field in (*meta.concrete_fields, *meta.many_to_many) if field.is_relation and field.related_model
+        }
+
+    def rekey(self, table: Table, model_cls: Model) -> Table:
+
+        # Отпечаток не зависит от режима: таблица из кэша переводится на ключи текущего режима,
+        # а id ContentType берутся заново, ведь база могла быть пересоздана.
+        related = self.get_related_models(model_cls)
+        contenttype = self.get_relation_key(model_cls)
+        fks = [Relation(r.attname, self.get_relation_key(related[r.attname])) for r in table.fks]
+        mtms = [Relation(r.attname, self.get_relation_key(related[r.attname]), r.related_name) for r in table.mtms]
+        old_refs = [table.contenttype, *(r.target for r in (*table.fks, *table.mtms))]
+        if old_refs == [contenttype, *(r.target for r in (*fks, *mtms))]:
+            return table
+        return Table(
+            app_label=table.app_label,
+            name=table.name,
+            model_name=table.model_name,
+            contenttype=contenttype,
+            fingerprint=table.fingerprint,
+            default_related_name=table.default_related_name,
+            fields=table.fields,
+            fks=fks,
+            mtms=mtms,
+            unique=table.unique,
+        )
+
+    def has_stale_ids(self, table: Table, model_cls: Model) -> bool:
+        # Ключи-метки не устаревают; id ContentType сверяются с текущей базой.
+        related = self.get_related_models(model_cls)
+        refs = [(table.contenttype, model_cls)]
+        refs += [(r.target, related[r.attname]) for r in (*table.fks, *table.mtms)]
+        return any(isinstance(ref, int) and ref != self.get_django_contenttype_id(model) for ref, model in refs)
+
+    def create_tables_map(self, cached: Optional[Schema] = None) -> Schema:
 
         data = {}
+        cached = cached or {}
 
         for app, tables in self.tables_to_parse.items():
-            data[app] = defaultdict(dict)
+            data[app] = App(app)
+            cached_app = cached.get(app, App(app))
             for t, model_cls in tables.items():
                 if not model_cls._meta.auto_created:
-                    data[app].update(
-                        {
-                            t: {
-                                "contenttype_id": self.get_django_contenttype_id(model_cls),
-                                **self.get_fields(model_cls),
-                            }
-                        }
+                    fingerprint = self.get_fingerprint(model_cls)
+                    cached_table = cached_app.tables.get(t)
+                    if cached_table and cached_table.fingerprint == fingerprint:
+                        data[app].tables[t] = self.rekey(cached_table, model_cls)
+                        continue
+                    data[app].tables[t] = Table(
+                        app_label=app,
+                        name=t,
+                        contenttype=self.get_relation_key(model_cls),
+                        fingerprint=fingerprint,
+                        **self.get_fields(model_cls),
                     )
         return data
-    
-    def generate_json_cache(self, data_to_cache: dict[str, defaultdict[str, dict[str, Any]]]) -> None:
 
-        path = os.path.join(self.config["cache_dir"], self.config["cache_filename"])
+    @staticmethod
+    def diff_fingerprints(old: dict[str, Optional[str]], new: dict[str, str]) -> tuple[list[str], list[str]]:
+        changed = [label for label, fp in new.items() if old.get(label) != fp]
+        removed = [label for label in old if label not in new]
+        return changed, removed
 
-        with open(path, "w") as f:
-            json.dump(data_to_cache, f, ensure_ascii=False, indent=2)
-    
-    def parse(self) -> None:
-        self.generate_json_cache(self.create_tables_map())
+    @cached_property
+    def cache(self) -> JsonSchemaCache:
+        return get_schema_cache(self.config["cache_dir"], self.config["cache_filename"], self.config["cache_format"])
 
+    def load_schema(self) -> Schema:
+        return load_schema(self.cache.read())
+
+    def generate_cache(self, data_to_cache: Schema) -> None:
+        self.cache.write(dump_schema(data_to_cache))
+
+    def stale_tables(self, schema: Schema) -> list[str]:
+
+        cached = {table.label: table.fingerprint for table in iter_tables(schema)}
+        models = {
+            f"{app}.{t}": model_cls
+            for app, tables in self.tables_to_parse.items()
+            for t, model_cls in tables.items() if not model_cls._meta.auto_created
+        }
+        current = {label: self.get_fingerprint(model_cls) for label, model_cls in models.items()}
+        changed, removed = self.diff_fingerprints(cached, current)
+        stale_ids = [
+            table.label for table in iter_tables(schema)
+            if table.label in models and table.label not in changed and self.has_stale_ids(table, models[table.label])
+        ]
+        return changed + removed + stale_ids
+
+    def parse(self, cached: Optional[Schema] = None) -> Schema:
+
+        # fill передает уже прочитанный кэш, чтобы не разбирать его второй раз.
+        if cached is None:
+            cached = self.load_schema()
+        data = self.create_tables_map(cached)
+        changed, removed = self.diff_fingerprints(
+            {table.label: table.fingerprint for table in iter_tables(cached)},
+            {table.label: table.fingerprint for table in iter_tables(data)},
+        )
+        # Тот же отпечаток, но другие ключи: кэш другого режима или id из пересозданной базы.
+        cached_tables = {table.label: table for table in iter_tables(cached)}
+        rekeyed = [
+            table.label for table in iter_tables(data)
+            if table.label not in changed and cached_tables[table.label] is not table
+        ]
+
+        if not changed and not removed and not rekeyed:
+            self.stdout.write("Schema cache is up to date.")
+            return data
+
+        self.generate_cache(data)
+        if changed:
+            self.stdout.write(f"Schema cache updated: {', '.join(changed)}")
+        if rekeyed:
+            self.stdout.write(f"Schema cache keys updated: {', '.join(rekeyed)}")
+        if removed:
+            self.stdout.write(f"Schema cache removed: {', '.join(removed)}")
+        return data
@@ -0,0 +1,67 @@
+from typing import Optional
+
+import numpy as np
+
+from .contenttypes import ContentTypeRef
+from .pools import PKRange
+
+
+MIN_PARTITION_ROWS = 10000
+
+
+class Partition:
+
+    __slots__ = ("contenttype", "index", "position", "rows", "offset", "pk_range", "seed", "stream")
+
+    def __init__(
+        self,
+        contenttype: ContentTypeRef,
+        index: int,
+        position: int,
+        rows: int,
+        offset: int,
+        pk_range: Optional[PKRange],
+        seed: np.random.SeedSequence,
+        stream: np.random.SeedSequence,
+    ):
+        self.contenttype = contenttype
+        self.index = index
+        self.position = position
+        self.rows = rows
+        self.offset = offset
+        self.pk_range = pk_range
+        self.seed = seed
+        self.stream = stream
+
+    def __repr__(self):
+        return f"<Partition {self.contenttype}#{self.index}: {self.rows} rows from {self.position}>"
+
+
+def split_rows(
+    contenttype: ContentTypeRef,
+    rows: int,
+    offset: int,
+    pk_range: Optional[PKRange],
+    seed: np.random.SeedSequence,
+    parts: int,
+) -> list[Partition]:
+    # Таблица делится только по зарезервированному диапазону: ключи и счетчики уникальных значений
+    # у частей не пересекаются, потому что считаются от начала своего поддиапазона.
+    parts = min(parts, -(-rows // MIN_PARTITION_ROWS)) if pk_range else 1
+    size, extra = divmod(rows, max(parts, 1))
+    # У каждой части свой независимый поток, порожденный зерном таблицы; сама таблица хранит общее зерно.
+    streams = seed.spawn(max(parts, 1))
+    partitions = []
+    position = 0
+    for index in range(max(parts, 1)):
+        part_rows = size + (index < extra)
+        part_range = None
+        part_offset = offset
+        if pk_range:
+            part_range = PKRange(pk_range.start + position, pk_range.start + position + part_rows)
+            part_offset = part_range.start - 1
+        partitions.append(
+            Partition(contenttype, index, position, part_rows, part_offset, part_range, seed, streams[index])
+        )
+        position += part_rows
+    return partitions
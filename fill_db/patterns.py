@@ -0,0 +1,162 @@
+import re
+import string
+from typing import Optional
+
+import numpy as np
+from django.db.models import Field as ModelField
+
+from .corpus import get_corpus
+from .generators import DEFAULT_STRING_LENGTH, UNIQUE_SUFFIX_LENGTH, check_capacity, encode_counter
+
+try:
+    # Разборщик re - внутренний модуль CPython без гарантий совместимости: без него все выражения непрозрачны.
+    from re import _constants as sre, _parser as sre_parser
+except ImportError:
+    sre = sre_parser = None
+
+ANY_ALPHABET = string.ascii_letters + string.digits
+CATEGORY_ALPHABETS = {
+    sre.CATEGORY_DIGIT: string.digits,
+    sre.CATEGORY_WORD: string.ascii_letters + string.digits + "_",
+    sre.CATEGORY_SPACE: " ",
+} if sre else {}
+ANCHORS = frozenset([sre.AT_BEGINNING, sre.AT_BEGINNING_STRING, sre.AT_END, sre.AT_END_STRING]) if sre else frozenset()
+MAX_EXPANDED_REPEAT = 16
+
+# Слот - класс символов и допустимое число повторений: (алфавит, минимум, максимум).
+Slot = tuple[str, int, int]
+
+
+def char_class(op, av) -> Optional[str]:
+    if op is sre.LITERAL:
+        return chr(av)
+    if op is sre.ANY:
+        return ANY_ALPHABET
+    if op is not sre.IN:
+        return None
+    chars = []
+    for item_op, item_av in av:
+        if item_op is sre.LITERAL:
+            chars.append(chr(item_av))
+        elif item_op is sre.RANGE:
+            chars.extend(map(chr, range(item_av[0], item_av[1] + 1)))
+        elif item_op is sre.CATEGORY and item_av in CATEGORY_ALPHABETS:
+            chars.extend(CATEGORY_ALPHABETS[item_av])
+        else:
+            return None
+    return "".join(dict.fromkeys(chars))
+
+
+def parse_slots(items) -> Optional[list[Slot]]:
+    slots = []
+    for op, av in items:
+        if op is sre.AT:
+            # RegexValidator использует search, якоря начала и конца строки ничего не добавляют к значению.
+            if av not in ANCHORS:
+                return None
+        elif op is sre.SUBPATTERN:
+            if (nested := parse_slots(av[-1])) is None:
+                return None
+            slots.extend(nested)
+        elif op in (sre.MAX_REPEAT, sre.MIN_REPEAT):
+            low, high, item = av
+            if len(item) == 1 and (alphabet := char_class(*item[0])):
+                if high == sre.MAXREPEAT:
+                    # Неограниченный повтор: хотя бы один символ, чтобы не получать пустые обязательные поля.
+                    low, high = max(low, 1), max(low, DEFAULT_STRING_LENGTH)
+                slots.append((alphabet, low, high))
+            elif low == high and low <= MAX_EXPANDED_REPEAT and (nested := parse_slots(item)) is not None:
+                slots.extend(nested * low)
+            else:
+                return None
+        elif alphabet := char_class(op, av):
+            slots.append((alphabet, 1, 1))
+        else:
+            return None
+    return slots
+
+
+def slot_strings(rng: np.random.Generator, size: int, alphabet: str, low: int, high: int) -> list[str]:
+    if len(alphabet) == 1:
+        if low == high:
+            return [alphabet * high] * size
+        return [alphabet * length for length in rng.integers(low, high, size, endpoint=True).tolist()]
+    return get_corpus(alphabet).cut(rng, size, low, high)
+
+
+class Pattern:
+    """
+    A regex reduced to a sequence of character-class slots, so matching
+    strings are produced directly. Only patterns without alternation,
+    lookarounds or negated classes compile; the rest stay opaque.
+    """
+
+    __slots__ = ("slots",)
+
+    def __init__(self, slots: list[Slot]):
+        self.slots = slots
+
+    def __repr__(self):
+        return f"<Pattern {self.slots}>"
+
+    def fit(self, min_length: Optional[int], max_length: Optional[int]) -> Optional["Pattern"]:
+        slots = [list(slot) for slot in self.slots]
+        if max_length is not None:
+            excess = sum(high for _, _, high in slots) - max_length
+            for slot in reversed(slots):
+                cut = min(max(excess, 0), slot[2] - slot[1])
+                slot[2] -= cut
+                excess -= cut
+            if excess > 0:
+                return None
+        if min_length is not None:
+            deficit = min_length - sum(low for _, low, _ in slots)
+            for slot in slots:
+                grow = min(max(deficit, 0), slot[2] - slot[1])
+                slot[1] += grow
+                deficit -= grow
+            if deficit > 0:
+                return None
+        return Pattern([tuple(slot) for slot in slots])
+
+    def generate(self, field: ModelField, size: int, rng: np.random.Generator) -> list[str]:
+        parts = [[""] * size]
+        for alphabet, low, high in self.slots:
+            parts.append(slot_strings(rng, size, alphabet, low, high))
+        return list(map("".join, zip(*parts)))
+
+    def counter_slot(self) -> int:
+        capacities = [len(alphabet) ** min(high, UNIQUE_SUFFIX_LENGTH) for alphabet, _, high in self.slots]
+        return capacities.index(max(capacities))
+
+    def generate_unique(self, field: ModelField, size: int, rng: np.random.Generator, start: int) -> list[str]:
+        # Все слоты фиксированной длины, счетчик с ведущими нулями в хвосте самого емкого слота:
+        # позиции символов совпадают у всех строк, поэтому разные счетчики дают разные строки.
+        if not self.slots:
+            check_capacity(field, start + size - 1, 1)
+        index = self.counter_slot() if self.slots else None
+        parts = [[""] * size]
+        for position, (alphabet, _, high) in enumerate(self.slots):
+            if position != index:
+                parts.append(slot_strings(rng, size, alphabet, high, high))
+                continue
+            digits = min(high, UNIQUE_SUFFIX_LENGTH)
+            check_capacity(field, start + size - 1, len(alphabet) ** digits)
+            suffixes = [
+                encode_counter(counter, alphabet).rjust(digits, alphabet[0]) for counter in range(start, start + size)
+            ]
+            heads = slot_strings(rng, size, alphabet, high - digits, high - digits)
+            parts.append(list(map(str.__add__, heads, suffixes)))
+        return list(map("".join, zip(*parts)))
+
+
+def compile_pattern(regex: str, flags: int = 0) -> Optional[Pattern]:
+    if sre_parser is None:
+        return None
+    try:
+        items = sre_parser.parse(regex, flags)
+    except re.error:
+        return None
+    if (slots := parse_slots(items)) is None:
+        return None
+    return Pattern(slots)
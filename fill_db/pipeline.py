@@ -0,0 +1,106 @@
+import time
+from queue import Empty, Full, Queue
+from threading import Event, Thread
+from typing import Any, Iterable, Iterator
+
+
+PUT_TIMEOUT = 0.1
+
+
+class StageTimes:
+
+    __slots__ = ("generate", "write", "elapsed")
+
+    def __init__(self, generate: float = 0.0, write: float = 0.0, elapsed: float = 0.0):
+        self.generate = generate
+        self.write = write
+        self.elapsed = elapsed
+
+    def __add__(self, other: "StageTimes") -> "StageTimes":
+        return StageTimes(self.generate + other.generate, self.write + other.write, self.elapsed + other.elapsed)
+
+    def __str__(self):
+        if not self.elapsed:
+            return "generate 0%, write 0%"
+        return f"generate {self.generate / self.elapsed:.0%}, write {self.write / self.elapsed:.0%}"
+
+
+def timed(items: Iterable, times: StageTimes) -> Iterator:
+    iterator = iter(items)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            times.generate += time.perf_counter() - started
+        yield item
+
+
+class Failure:
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+DONE = object()
+
+
+class Pipeline:
+    """
+    Runs a batch iterator in a producer thread and hands ready batches to the
+    consumer through a bounded queue: generation of the next batches overlaps
+    the write of the current one, and a full queue blocks the producer.
+    """
+
+    def __init__(self, batches: Iterable, depth: int, times: StageTimes):
+        self.batches = batches
+        self.depth = depth
+        self.times = times
+
+    @staticmethod
+    def put(queue: Queue, item: Any, stop: Event) -> bool:
+        # Ожидание с таймаутом: если потребитель упал, поток-производитель не повиснет на полной очереди.
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=PUT_TIMEOUT)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce(self, queue: Queue, stop: Event) -> None:
+        try:
+            for batch in timed(self.batches, self.times):
+                if not self.put(queue, batch, stop):
+                    return
+        except BaseException as error:
+            self.put(queue, Failure(error), stop)
+        else:
+            self.put(queue, DONE, stop)
+
+    def __iter__(self) -> Iterator:
+
+        queue = Queue(self.depth)
+        stop = Event()
+        producer = Thread(target=self.produce, args=(queue, stop), name="fill-db-producer", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = queue.get()
+                if item is DONE:
+                    return
+                if isinstance(item, Failure):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            try:
+                while True:
+                    queue.get_nowait()
+            except Empty:
+                pass
+            producer.join()
@@ -0,0 +1,66 @@
+from django.utils.functional import cached_property
+
+from .contenttypes import ContentTypeRef
+from .exceptions import CyclicRelationError
+from .handers import MessageHandler
+from .schema import Relation, Schema, Table, iter_tables
+
+
+class Planner(MessageHandler):
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+
+    @cached_property
+    def tables(self) -> dict[ContentTypeRef, Table]:
+        return {table.contenttype: table for table in iter_tables(self.schema)}
+
+    def get_parents(self, table: Table) -> set[ContentTypeRef]:
+        # Ссылки на саму себя не влияют на порядок, такие fk заполняются уже существующими строками.
+        return {relation.target for relation in table.fks if relation.target != table.contenttype}
+
+    def sort(self, refs: list[ContentTypeRef]) -> list[ContentTypeRef]:
+        return sorted(refs, key=lambda ref: self.tables[ref].label)
+
+    @cached_property
+    def layers(self) -> tuple[tuple[Table, ...], ...]:
+
+        parents = {ref: self.get_parents(table) for ref, table in self.tables.items()}
+        children = {ref: set() for ref in self.tables}
+        for ref, targets in parents.items():
+            for target in targets:
+                children[target].add(ref)
+
+        layers = []
+        ready = self.sort([ref for ref, targets in parents.items() if not targets])
+        pending = {ref: len(targets) for ref, targets in parents.items()}
+
+        while ready:
+            layers.append(tuple(self.tables[ref] for ref in ready))
+            next_ready = []
+            for ref in ready:
+                for child in children[ref]:
+                    pending[child] -= 1
+                    if not pending[child]:
+                        next_ready.append(child)
+                del pending[ref]
+            ready = self.sort(next_ready)
+
+        if pending:
+            raise CyclicRelationError(
+                "Models have cyclic fk relations: " + ", ".join(sorted(self.tables[ref].label for ref in pending))
+            )
+        return tuple(layers)
+
+    @cached_property
+    def mtms(self) -> tuple[tuple[Table, Relation], ...]:
+        return tuple((table, relation) for layer in self.layers for table in layer for relation in table.mtms)
+
+    def dry_run(self) -> None:
+
+        for i, layer in enumerate(self.layers, start=1):
+            self.stdout.write(f"Layer {i}: {', '.join(table.label for table in layer)}")
+        if self.mtms:
+            self.stdout.write(
+                "Many to many: " + ", ".join(f"{table.label}.{relation.attname}" for table, relation in self.mtms)
+            )
@@ -0,0 +1,59 @@
+import numpy as np
+from django.db.models import Model
+
+
+INTEGER_PK_TYPES = frozenset(["AutoField", "BigAutoField", "SmallAutoField", "IntegerField", "BigIntegerField"])
+LOAD_CHUNK_SIZE = 10000
+
+
+class PKPool:
+
+    __slots__ = ("pks",)
+
+    def __init__(self, pks: np.ndarray):
+        self.pks = pks
+
+    def __len__(self):
+        return len(self.pks)
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return self.pks[rng.integers(0, len(self.pks), size)]
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        return self.pks[indices]
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.pks.dtype != object
+
+    def after(self, offset: int) -> "PKPool":
+        # Ключи отсортированы, новые строки - хвост массива; нечисловые ключи так не отделить.
+        if not self.is_numeric:
+            return self
+        return PKPool(self.pks[np.searchsorted(self.pks, offset, side="right"):])
+
+    @classmethod
+    def load(cls, model_cls: type[Model]) -> "PKPool":
+        # Ключи читаются потоком через iterator(), в памяти остается только компактный массив.
+        pk_type = model_cls._meta.pk.get_internal_type()
+        dtype = np.int64 if pk_type in INTEGER_PK_TYPES else object
+        queryset = model_cls._default_manager.order_by("pk").values_list("pk", flat=True)
+        return cls(np.fromiter(queryset.iterator(chunk_size=LOAD_CHUNK_SIZE), dtype=dtype))
+
+
+class PKRange:
+
+    __slots__ = ("start", "stop")
+
+    def __init__(self, start: int, stop: int):
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.integers(self.start, self.stop, size)
+
+    def take(self, indices: np.ndarray) -> np.ndarray:
+        return self.start + indices
@@ -0,0 +1,183 @@
+from datetime import datetime
+from functools import partial
+from typing import Callable, Optional, Union
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db.models import Field as ModelField, Model
+from django.utils.module_loading import import_string
+
+from .contenttypes import get_model
+from .corpus import ALPHABETS, TEXT_ALPHABETS
+from .exceptions import UniqueCapacityError, UnknownFieldError, UnsatisfiableFieldError
+from .generators import (
+    FIELD_GENERATORS, UNIQUE_FIELD_GENERATORS, Generator, UniqueGenerator, generate_char, generate_choice, generate_date,
+    generate_datetime, generate_text, generate_unique_choice,
+)
+from .media import MediaPool
+from .schema import Field, Schema, Table, iter_tables
+from .users import UserStrategy
+from .validators import Constraints
+
+
+Column = Callable[[int, np.random.Generator], list]
+UniqueColumn = Callable[[int, np.random.Generator, int], list]
+CompiledTable = tuple[tuple[str, Union[Column, UniqueColumn], bool], ...]
+
+REJECTION_ATTEMPTS = 100
+
+
+def reject_duplicates(
+    generator: Generator, field: ModelField, size: int, rng: np.random.Generator, start: int, seen: set,
+) -> list:
+    # Запасной путь для полей без уникального генератора: добираем пачку, отбрасывая уже выданные значения.
+    values = []
+    for _ in range(REJECTION_ATTEMPTS):
+        for value in generator(field, size - len(values), rng):
+            if value not in seen:
+                seen.add(value)
+                values.append(value)
+        if len(values) == size:
+            return values
+    raise UniqueCapacityError(f"Could not generate {size} distinct values for {field.model._meta.label_lower}.{field.name}")
+
+
+def reject_invalid(
+    generator: Generator, validators: list[Callable], field: ModelField, size: int, rng: np.random.Generator,
+) -> list:
+    # Непрозрачные валидаторы проверяются пачкой: добираем колонку, отбрасывая невалидные значения.
+    values = []
+    for _ in range(REJECTION_ATTEMPTS):
+        for value in generator(field, size - len(values), rng):
+            try:
+                for validator in validators:
+                    validator(value)
+            except ValidationError:
+                continue
+            values.append(value)
+        if len(values) == size:
+            return values
+    raise UnsatisfiableFieldError(
+        f"Generated values for {field.model._meta.label_lower}.{field.name} keep failing its validators, "
+        "register a matching generator in AUTO_FILL_CONFIG['generators']"
+    )
+
+
+class GeneratorRegistry:
+
+    def __init__(
+        self,
+        generators: Optional[dict[str, Union[Generator, str]]] = None,
+        unique_generators: Optional[dict[str, Union[UniqueGenerator, str]]] = None,
+        users: Optional[UserStrategy] = None,
+        media: Optional[MediaPool] = None,
+        text_alphabet: str = "latin",
+        now: Optional[datetime] = None,
+    ):
+
+        assert text_alphabet in ALPHABETS, f"'text_alphabet' in config must be one of {', '.join(ALPHABETS)}"
+        self.users = users or UserStrategy()
+        self.media = media or MediaPool()
+        # Файловым полям нужны настоящие файлы: генераторы берутся из пула медиа, у которого есть настройки и состояние.
+        self._generators: dict[str, Generator] = {
+            **FIELD_GENERATORS,
+            "CharField": partial(generate_char, alphabet=ALPHABETS[text_alphabet]),
+            "TextField": partial(generate_text, alphabet=TEXT_ALPHABETS[text_alphabet]),
+            "FileField": self.media.generate,
+            "ImageField": self.media.generate,
+        }
+        if now:
+            # Даты отсчитываются от заданного момента, а не от текущего времени.
+            self._generators.update({
+                "DateTimeField": partial(generate_datetime, now=now), "DateField": partial(generate_date, now=now),
+            })
+        self._unique_generators: dict[str, UniqueGenerator] = {
+            **UNIQUE_FIELD_GENERATORS, "FileField": self.media.generate_unique, "ImageField": self.media.generate_unique,
+        }
+        if generators:
+            assert isinstance(generators, dict), "'generators' in config must be dict instance"
+            for field_type, generator in generators.items():
+                self.register(field_type, generator)
+        if unique_generators:
+            assert isinstance(unique_generators, dict), "'unique_generators' in config must be dict instance"
+            for field_type, generator in unique_generators.items():
+                self.register(field_type, generator, unique=True)
+
+    def register(self, field_type: str, generator: Union[Generator, UniqueGenerator, str], unique: bool = False) -> None:
+        if isinstance(generator, str):
+            generator = import_string(generator)
+        assert callable(generator), f"generator for {field_type} must be callable"
+        if unique:
+            self._unique_generators[field_type] = generator
+        else:
+            self._generators[field_type] = generator
+            # Переопределенный обычный генератор не должен молча подменяться встроенным уникальным.
+            self._unique_generators.pop(field_type, None)
+
+    @staticmethod
+    def get_keys(field: ModelField):
+        # Ключ - полный путь к классу поля или имя класса, как оно записано в кэше. Наследники берут генератор родителя.
+        for cls in type(field).__mro__:
+            yield f"{cls.__module__}.{cls.__qualname__}", cls.__name__
+
+    def get(self, field: ModelField) -> Generator:
+
+        if field.choices:
+            return generate_choice
+        for keys in self.get_keys(field):
+            for key in keys:
+                if generator := self._generators.get(key):
+                    return generator
+        raise self.unknown_field_error(field)
+
+    def get_unique(self, field: ModelField) -> UniqueColumn:
+
+        if field.choices:
+            return generate_unique_choice
+        for keys in self.get_keys(field):
+            for key in keys:
+                if generator := self._unique_generators.get(key):
+                    return generator
+                if key in self._generators:
+                    return partial(reject_duplicates, self._generators[key], seen=set())
+        raise self.unknown_field_error(field)
+
+    @staticmethod
+    def unknown_field_error(field: ModelField) -> UnknownFieldError:
+        return UnknownFieldError(
+            f"No generator for field {field.model._meta.label_lower}.{field.name} ({type(field).__name__}), "
+            "register one in AUTO_FILL_CONFIG['generators']"
+        )
+
+    def compile_field(self, cached: Field, field: ModelField, unique: bool) -> Union[Column, UniqueColumn]:
+        # Известные валидаторы уже учтены в генераторе: регулярное выражение, границы значений и длины.
+        constraints = Constraints.compile(field, cached)
+        view = constraints.view(field)
+        pattern = constraints.pattern
+        if constraints.opaque:
+            generator = partial(reject_invalid, pattern.generate if pattern else self.get(field), constraints.opaque)
+            if unique:
+                return partial(reject_duplicates, generator, view, seen=set())
+            return partial(generator, view)
+        if unique:
+            return partial(pattern.generate_unique if pattern else self.get_unique(field), view)
+        return partial(pattern.generate if pattern else self.get(field), view)
+
+    def compile(self, table: Table, model_cls: type[Model]) -> CompiledTable:
+        model_fields = {field.attname: field for field in model_cls._meta.concrete_fields}
+        # У модели пользователя пароль, имя и почта берутся из стратегии, остальные поля - из реестра.
+        overrides = self.users.get_columns(model_cls) if self.users.applies(model_cls) else {}
+        compiled = []
+        for f in table.fields:
+            if f.attname in overrides:
+                column, unique = overrides[f.attname]
+                compiled.append((f.attname, column, unique))
+                continue
+            unique = f.attname in table.unique_columns
+            if not unique and self.get(model_fields[f.attname]) == self.media.generate:
+                self.media.register(model_fields[f.attname])
+            compiled.append((f.attname, self.compile_field(f, model_fields[f.attname], unique), unique))
+        return tuple(compiled)
+
+    def compile_schema(self, schema: Schema) -> dict[str, CompiledTable]:
+        return {table.label: self.compile(table, get_model(table.contenttype)) for table in iter_tables(schema)}
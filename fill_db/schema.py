@@ -0,0 +1,162 @@
+from typing import Any, Iterable, Optional
+
+from .contenttypes import ContentTypeRef
+
+
+class Field:
+
+    __slots__ = ("attname", "type", "max_length", "validators")
+
+    def __init__(
+        self,
+        attname: str,
+        type: str,
+        max_length: Optional[int] = None,
+        validators: Iterable[dict[str, Any]] = (),
+    ):
+        self.attname = attname
+        self.type = type
+        self.max_length = max_length
+        self.validators = tuple(validators)
+
+    def __repr__(self):
+        return f"<Field {self.attname}: {self.type}>"
+
+
+class Relation:
+
+    __slots__ = ("attname", "target", "related_name")
+
+    def __init__(self, attname: str, target: ContentTypeRef, related_name: Optional[str] = None):
+        self.attname = attname
+        self.target = target
+        self.related_name = related_name
+
+    def __repr__(self):
+        return f"<Relation {self.attname} -> {self.target}>"
+
+
+class Table:
+
+    __slots__ = (
+        "app_label", "name", "model_name", "contenttype", "fingerprint", "default_related_name",
+        "fields", "fks", "mtms", "unique", "unique_columns", "unique_fk_sets",
+    )
+
+    def __init__(
+        self,
+        app_label: str,
+        name: str,
+        model_name: str,
+        contenttype: ContentTypeRef,
+        fingerprint: Optional[str],
+        default_related_name: Optional[str],
+        fields: Iterable[Field],
+        fks: Iterable[Relation],
+        mtms: Iterable[Relation],
+        unique: Iterable[Iterable[str]] = (),
+    ):
+        self.app_label = app_label
+        self.name = name
+        self.model_name = model_name
+        self.contenttype = contenttype
+        self.fingerprint = fingerprint
+        self.default_related_name = default_related_name
+        self.fields = tuple(fields)
+        self.fks = tuple(fks)
+        self.mtms = tuple(mtms)
+        self.unique = tuple(tuple(fields_set) for fields_set in unique)
+        self.unique_columns, self.unique_fk_sets = self.split_unique()
+
+    def __repr__(self):
+        return f"<Table {self.label}>"
+
+    @property
+    def label(self) -> str:
+        return f"{self.app_label}.{self.name}"
+
+    def split_unique(self) -> tuple[frozenset[str], tuple[tuple[str, ...], ...]]:
+        # Набор с обычным полем различим, если различно одно это поле: оно генерируется по счетчику.
+        # Наборы только из fk выбираются без повторений из произведения пулов родителей.
+        simple = {f.attname for f in self.fields}
+        unique_columns = set()
+        unique_fk_sets = []
+        for fields_set in self.unique:
+            simple_fields = [attname for attname in fields_set if attname in simple]
+            if not simple_fields:
+                unique_fk_sets.append(fields_set)
+            elif not unique_columns.intersection(simple_fields):
+                unique_columns.add(simple_fields[0])
+        return frozenset(unique_columns), tuple(unique_fk_sets)
+
+    @classmethod
+    def from_dict(cls, app_label: str, name: str, data: dict[str, Any]) -> "Table":
+        return cls(
+            app_label=app_label,
+            name=name,
+            model_name=data["model_name"],
+            contenttype=data["contenttype_id"],
+            fingerprint=data.get("fingerprint"),
+            default_related_name=data["default_related_name"],
+            fields=[
+                Field(attname, type, **data.get("constraints", {}).get(attname, {}))
+                for attname, type in data["simple"].items()
+            ],
+            fks=[Relation(attname, target) for attname, target in data["fk"].items()],
+            mtms=[
+                Relation(attname, relation["contenttype_id"], relation["related_name"])
+                for attname, relation in data["mtm"].items()
+            ],
+            unique=data.get("unique", ()),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "contenttype_id": self.contenttype,
+            "fingerprint": self.fingerprint,
+            "simple": {f.attname: f.type for f in self.fields},
+            "constraints": {
+                f.attname: {"max_length": f.max_length, "validators": list(f.validators)}
+                for f in self.fields if f.max_length is not None or f.validators
+            },
+            "fk": {r.attname: r.target for r in self.fks},
+            "mtm": {r.attname: {"contenttype_id": r.target, "related_name": r.related_name} for r in self.mtms},
+            "unique": [list(fields_set) for fields_set in self.unique],
+            "default_related_name": self.default_related_name,
+            "model_name": self.model_name,
+        }
+
+
+class App:
+
+    __slots__ = ("label", "tables")
+
+    def __init__(self, label: str, tables: Optional[dict[str, Table]] = None):
+        self.label = label
+        self.tables = tables or {}
+
+    def __repr__(self):
+        return f"<App {self.label}: {len(self.tables)} tables>"
+
+    @classmethod
+    def from_dict(cls, label: str, data: dict[str, dict[str, Any]]) -> "App":
+        return cls(label, {name: Table.from_dict(label, name, table) for name, table in data.items()})
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        return {name: table.to_dict() for name, table in self.tables.items()}
+
+
+Schema = dict[str, App]
+
+
+def load_schema(data: dict[str, dict[str, dict[str, Any]]]) -> Schema:
+    return {label: App.from_dict(label, tables) for label, tables in data.items()}
+
+
+def dump_schema(schema: Schema) -> dict[str, dict[str, dict[str, Any]]]:
+    return {label: app.to_dict() for label, app in schema.items()}
+
+
+def iter_tables(schema: Schema) -> Iterable[Table]:
+    for app in schema.values():
+        yield from app.tables.values()
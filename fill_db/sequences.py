@@ -0,0 +1,33 @@
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max, Model
+
+from .pools import INTEGER_PK_TYPES, PKRange
+
+
+def can_reserve(model_cls: type[Model]) -> bool:
+    pk = model_cls._meta.pk
+    return pk.get_internal_type() in INTEGER_PK_TYPES and not pk.is_relation
+
+
+def reserve_range(model_cls: type[Model], count: int) -> PKRange:
+    # Диапазон считается от текущего максимума, параллельная запись в ту же таблицу во время заполнения не поддерживается.
+    current_max = model_cls._default_manager.aggregate(current_max=Max("pk"))["current_max"] or 0
+    return PKRange(current_max + 1, current_max + 1 + count)
+
+
+def reset_sequences(models: list[type[Model]]) -> None:
+
+    if not models:
+        return
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+        if connection.vendor == "sqlite":
+            for model_cls in models:
+                meta = model_cls._meta
+                cursor.execute(
+                    f'UPDATE sqlite_sequence SET seq = (SELECT COALESCE(MAX("{meta.pk.column}"), 0) FROM "{meta.db_table}") '
+                    "WHERE name = %s",
+                    [meta.db_table],
+                )
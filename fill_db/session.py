@@ -0,0 +1,62 @@
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from django.db import connection, transaction
+
+from .handers import MessageHandler
+
+
+# Отрицательный cache_size задается в килобайтах: 256 MiB страниц вместо стандартных 2 MiB.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "OFF",
+    "cache_size": -256 * 1024,
+}
+
+
+class BulkLoadSession(MessageHandler):
+    """
+    Connection settings for a bulk load. Pragmas of the SQLite connection are
+    changed for the whole fill and restored on exit; PostgreSQL settings are
+    set with SET LOCAL in every transaction and end together with it.
+    """
+
+    def __init__(self, enabled: bool = False, transaction_rows: Optional[int] = None):
+        self.enabled = enabled
+        # Без сессии часть таблицы пишется одной транзакцией: при ошибке не остается половины строк.
+        self.transaction_rows = transaction_rows if enabled else None
+        self.saved: dict[str, Any] = {}
+
+    def __enter__(self) -> "BulkLoadSession":
+
+        if not self.enabled or connection.vendor != "sqlite":
+            return self
+        # journal_mode нельзя сменить внутри транзакции, поэтому прагмы ставятся до первой записи.
+        with connection.cursor() as cursor:
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {name}")
+                self.saved[name] = cursor.fetchone()[0]
+                cursor.execute(f"PRAGMA {name} = {value}")
+        self.stdout.write(
+            "Bulk-load session: " + ", ".join(f"{name}={value}" for name, value in SQLITE_PRAGMAS.items())
+        )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+
+        if not self.saved:
+            return
+        with connection.cursor() as cursor:
+            for name in reversed(list(self.saved)):
+                cursor.execute(f"PRAGMA {name} = {self.saved[name]}")
+        self.saved.clear()
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        with transaction.atomic():
+            if self.enabled and connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL synchronous_commit = off")
+                    # Действует на ограничения, объявленные DEFERRABLE; Django создает так все fk.
+                    cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+            yield
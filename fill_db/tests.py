@@ -0,0 +1,100 @@
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import OutputWrapper
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .checksum import Checksum, table_checksum
+from .engine import FillEngine, init_worker
+from .handers import MessageHandler
+from .management.commands.run import Command
+from .parser import Parser
+from .planner import Planner
+
+
+SEED = 42
+ROWS = 500
+
+
+def silence_output(test_case) -> None:
+    patcher = mock.patch.object(MessageHandler, "_stdout", OutputWrapper(StringIO()))
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+
+
+def start_fork_workers(engine: FillEngine) -> ProcessPoolExecutor:
+    # Тот же пул, что и в start_workers, но без отказа для SQLite: писатели ждут друг друга по timeout.
+    executor = ProcessPoolExecutor(
+        engine.workers, mp_context=multiprocessing.get_context("fork"), initializer=init_worker, initargs=(engine,),
+    )
+    connections.close_all()
+    executor.submit(int).result()
+    return executor
+
+
+class ParserQueriesTest(TestCase):
+
+    def setUp(self):
+        silence_output(self)
+        # Кэш менеджера ContentType общий для тестов: без сброса запрос мог бы не дойти до базы.
+        ContentType.objects.clear_cache()
+
+    def test_create_tables_map_online(self):
+        with self.assertNumQueries(1):
+            Parser().create_tables_map()
+
+    def test_create_tables_map_offline(self):
+        with self.assertNumQueries(0):
+            Parser(offline=True).create_tables_map()
+
+
+class SeededFillTest(TransactionTestCase):
+
+    reset_sequences = True
+
+    def setUp(self):
+        silence_output(self)
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        for patcher in (
+            mock.patch.dict(connection.settings_dict["OPTIONS"], timeout=30),
+            # Несколько частей на таблицу и при малом числе строк.
+            mock.patch("fill_db.partitions.MIN_PARTITION_ROWS", 100),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.parser = Parser(offline=True)
+        self.schema = self.parser.create_tables_map()
+
+    def fill(self, workers: int) -> dict[str, tuple[int, str]]:
+        FillEngine(
+            self.schema,
+            rows=ROWS,
+            batch_size=self.parser.config["batch_size"],
+            registry=Command.get_registry(self.parser.config, SEED),
+            reserve_pks=True,
+            workers=workers,
+            seed=SEED,
+        ).fill()
+        return {
+            model_cls._meta.label_lower: table_checksum(model_cls)
+            for model_cls in Checksum(Planner(self.schema)).get_models()
+        }
+
+    def test_workers_do_not_change_digests(self):
+        single = self.fill(workers=1)
+        call_command("flush", interactive=False, reset_sequences=True, verbosity=0)
+        with mock.patch.object(FillEngine, "start_workers", autospec=True, side_effect=start_fork_workers) as start:
+            pooled = self.fill(workers=3)
+        start.assert_called_once()
+        self.assertTrue(all(rows for rows, _ in single.values()))
+        self.assertEqual(single, pooled)
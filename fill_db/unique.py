@@ -0,0 +1,173 @@
+from math import gcd, prod
+from typing import Union
+
+import numpy as np
+
+from .distributions import RESAMPLE_ATTEMPTS, Distribution
+from .exceptions import UniqueCapacityError
+from .pools import PKPool, PKRange
+from .registry import Column
+
+
+def distinct_indices(size: int, fanout: int, space: int, rng: np.random.Generator) -> np.ndarray:
+    # Строка i берет индексы (o_i + j * s_i) mod space для j < fanout: при gcd(s_i, space) == 1 они различны.
+    offsets = rng.integers(0, space, size)
+    steps = np.ones(size, dtype=np.int64)
+    if space > 1:
+        steps = rng.integers(1, space, size)
+        while (shared := np.gcd(steps, space) != 1).any():
+            steps[shared] = rng.integers(1, space, int(shared.sum()))
+    return (offsets[:, None] + np.arange(fanout) * steps[:, None]) % space
+
+
+def distinct_links(counts: np.ndarray, space: int, distribution: Distribution, rng: np.random.Generator) -> np.ndarray:
+    # Индексы целей всех строк подряд: counts[i] различных индексов для строки i.
+    width = int(counts.max()) if len(counts) else 0
+    mask = np.arange(width) < counts[:, None]
+    if not distribution.skewed:
+        return distinct_indices(len(counts), width, space, rng)[mask]
+    matrix = distribution.sample(len(counts) * width, space, rng).reshape(len(counts), width)
+    # Лишние позиции строки получают различные отрицательные метки: они не совпадают с индексами и отбрасываются.
+    matrix[~mask] = -1 - np.broadcast_to(np.arange(width), matrix.shape)[~mask]
+    for _ in range(RESAMPLE_ATTEMPTS):
+        matrix.sort(axis=1)
+        repeated = np.zeros(matrix.shape, dtype=bool)
+        repeated[:, 1:] = matrix[:, 1:] == matrix[:, :-1]
+        if not repeated.any():
+            break
+        matrix[repeated] = distribution.sample(int(repeated.sum()), space, rng)
+    else:
+        # Распределение сосредоточено на немногих целях: такие строки берут различные индексы равномерно.
+        rows = np.flatnonzero(repeated.any(axis=1))
+        replaced = distinct_indices(len(rows), width, space, rng)
+        replaced[~mask[rows]] = -1
+        matrix[rows] = replaced
+    return matrix[matrix >= 0]
+
+
+class UniqueTuples:
+    """
+    Distinct fk tuples without retries: row k takes the combination
+    (a * k + c) mod space of the parent pools' product, which is a
+    bijection for gcd(a, space) == 1, then splits it into per-pool indices.
+    """
+
+    def __init__(
+        self, label: str, pools: dict[str, Union[PKPool, PKRange]], rows: int, rng: np.random.Generator, start: int = 0,
+    ):
+        self.pools = pools
+        self.space = prod(len(pool) for pool in pools.values())
+        if rows > self.space:
+            raise UniqueCapacityError(
+                f"{label} needs {rows} distinct ({', '.join(pools)}) tuples, parents allow only {self.space}"
+            )
+        # Множитель ограничен так, чтобы a * k + c помещалось в int64; для огромных произведений - питоновские int.
+        int64_bound = (2 ** 63 - 1) // (2 * self.space) if self.space else 0
+        self.dtype = np.int64 if int64_bound >= 2 else object
+        bound = min(self.space, int64_bound if self.dtype is np.int64 else 2 ** 62)
+        self.multiplier = 1
+        while self.space > 1:
+            self.multiplier = int(rng.integers(1, bound))
+            if gcd(self.multiplier, self.space) == 1:
+                break
+        self.increment = int(rng.integers(0, bound)) if self.space else 0
+        self.position = start
+        self.pending: dict[str, list] = {}
+
+    def split(self, combinations: np.ndarray, pools: dict[str, Union[PKPool, PKRange]]) -> None:
+        for attname, pool in pools.items():
+            # divmod не определен для object-массивов, поэтому остаток и частное отдельно.
+            indices = combinations % len(pool)
+            combinations = combinations // len(pool)
+            self.pending[attname] = pool.take(indices.astype(np.int64)).tolist()
+
+    def generate(self, size: int, rng: np.random.Generator) -> None:
+        combinations = (
+            np.arange(self.position, self.position + size).astype(self.dtype) * self.multiplier + self.increment
+        ) % self.space
+        self.position += size
+        self.split(combinations, self.pools)
+
+    def column(self, attname: str) -> Column:
+
+        def column(size: int, rng: np.random.Generator) -> list:
+            if not self.pending:
+                self.generate(size, rng)
+            return self.pending.pop(attname)
+
+        return column
+
+
+def occurrences(parents: np.ndarray) -> np.ndarray:
+    # Номер появления значения внутри пачки: 0 для первого, 1 для второго и так далее.
+    order = np.argsort(parents, kind="stable")
+    ordered = parents[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ranks = np.empty(len(parents), dtype=np.int64)
+    ranks[order] = np.arange(len(parents)) - np.repeat(starts, np.diff(np.r_[starts, len(parents)]))
+    return ranks
+
+
+class SkewedTuples(UniqueTuples):
+    """
+    Distinct fk tuples whose lead column follows a distribution. The lead
+    parent is drawn for every row; its k-th row takes the combination
+    (s * p + a * k) mod space of the other pools' product, distinct for
+    k < space when gcd(a, space) == 1. Parents out of combinations are
+    drawn again. Uses per-parent counters, so the table is one partition.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        pools: dict[str, Union[PKPool, PKRange]],
+        lead: str,
+        distribution: Distribution,
+        rows: int,
+        rng: np.random.Generator,
+    ):
+        self.lead = lead
+        self.lead_pool = pools[lead]
+        self.distribution = distribution
+        rest = {attname: pool for attname, pool in pools.items() if attname != lead}
+        # Емкость проверяется по полному произведению ниже, на одного родителя хватает и меньшего числа пар.
+        super().__init__(label, rest, 0, rng)
+        if rows > self.space * len(self.lead_pool):
+            raise UniqueCapacityError(
+                f"{label} needs {rows} distinct ({', '.join(pools)}) tuples, "
+                f"parents allow only {self.space * len(self.lead_pool)}"
+            )
+        # Произведения p * s и k * a должны помещаться в int64, иначе - питоновские int.
+        if max(self.space, len(self.lead_pool)) >= 2 ** 31:
+            self.dtype = object
+        self.spread = int(rng.integers(0, self.space)) if self.space else 0
+        self.counts = np.zeros(len(self.lead_pool), dtype=np.int64)
+
+    def sample_parents(self, size: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+
+        space = len(self.lead_pool)
+        parents = self.distribution.sample(size, space, rng, self.position)
+        for _ in range(RESAMPLE_ATTEMPTS):
+            used = self.counts[parents] + occurrences(parents)
+            full = used >= self.space
+            if not full.any():
+                return parents, used
+            parents[full] = self.distribution.sample(int(full.sum()), space, rng, self.position)
+        # Распределение держится за уже исчерпанных родителей: остаток строк идет к родителям со свободными парами.
+        taken = self.counts + np.bincount(parents[~full], minlength=space)
+        spare = np.flatnonzero(taken < self.space)
+        capacity = np.cumsum(self.space - taken[spare])
+        parents[full] = spare[np.searchsorted(capacity, np.arange(int(full.sum())), side="right")]
+        return parents, self.counts[parents] + occurrences(parents)
+
+    def generate(self, size: int, rng: np.random.Generator) -> None:
+        parents, used = self.sample_parents(size, rng)
+        # Обновляются только выпавшие родители: bincount по всему пулу на каждую пачку стоил бы O(родителей).
+        values, repeats = np.unique(parents, return_counts=True)
+        self.counts[values] += repeats
+        self.position += size
+        combinations = (
+            parents.astype(self.dtype) * self.spread + used.astype(self.dtype) * self.multiplier
+        ) % self.space
+        self.pending[self.lead] = self.lead_pool.take(parents).tolist()
+        self.split(combinations, self.pools)
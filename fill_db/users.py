@@ -0,0 +1,100 @@
+from functools import cached_property
+from typing import Callable, Optional
+
+import numpy as np
+from django.conf import settings as django_settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import CharField, EmailField, Field as ModelField, Model
+from django.utils.module_loading import import_string
+
+from .generators import check_capacity, random_strings
+from .handers import MessageHandler
+
+
+USERNAME_PREFIX = "user"
+EMAIL_DOMAIN = "@example.com"
+SALT_LENGTH = 22
+# С общим известным паролем случайные суперпользователи были бы дырой: флаги у всех строк одинаковые.
+USER_FLAGS = {"is_active": True, "is_staff": False, "is_superuser": False}
+
+
+def seeded_salt(seed: int) -> str:
+    # Соль из seed: хэш пароля, как и остальные колонки, совпадает в повторных заполнениях.
+    return random_strings(np.random.default_rng(seed), 1, SALT_LENGTH)[0]
+
+
+class UserStrategy(MessageHandler):
+    """
+    Columns of the user model: one password hash shared by every row, active
+    non-staff accounts, and usernames / emails built from the row counter,
+    so they are unique and stay within max_length without per-row work.
+    """
+
+    def __init__(self, password: str = "password", hasher: Optional[str] = None, salt: Optional[str] = None):
+        self.password = password
+        self.hasher = hasher
+        self.salt = salt
+
+    @cached_property
+    def password_hash(self) -> str:
+        # Хэш считается один раз на заполнение: PBKDF2 на каждую строку ограничивает скорость сотнями строк в секунду.
+        if not self.hasher:
+            return make_password(self.password, self.salt)
+        # Быстрый хэшер используется только здесь, настройки проекта не меняются.
+        if self.hasher not in django_settings.PASSWORD_HASHERS:
+            self.stdout.write(
+                f"WARNING: {self.hasher} is not in PASSWORD_HASHERS, generated users will not be able to log in."
+            )
+        return make_password(self.password, self.salt, import_string(self.hasher)())
+
+    @staticmethod
+    def applies(model_cls: type[Model]) -> bool:
+        return issubclass(model_cls, AbstractBaseUser)
+
+    def password_column(self, size: int, rng: np.random.Generator) -> list[str]:
+        return [self.password_hash] * size
+
+    @staticmethod
+    def constant_column(value: bool) -> Callable:
+        return lambda size, rng: [value] * size
+
+    @staticmethod
+    def counter_strings(field: ModelField, suffix: str = "") -> Optional[Callable]:
+        # Имя из счетчика строки: уникально и между запусками, потому что счетчик продолжается с максимального ключа.
+        digits = (field.max_length or 0) - len(USERNAME_PREFIX) - len(suffix)
+        if digits < 1:
+            return None
+
+        def column(size: int, rng: np.random.Generator, start: int) -> list[str]:
+            check_capacity(field, start + size - 1, 10 ** digits)
+            return [f"{USERNAME_PREFIX}{counter}{suffix}" for counter in range(start, start + size)]
+
+        try:
+            # Собственные валидаторы поля могут не принять такое имя, тогда остается обычный генератор.
+            field.run_validators(column(1, None, 0)[0])
+        except ValidationError:
+            return None
+        return column
+
+    def get_columns(self, model_cls: type[Model]) -> dict[str, tuple[Callable, bool]]:
+        # Колонки имени и почты считаются от счетчика строки, поэтому помечаются как уникальные.
+        meta = model_cls._meta
+        columns = {meta.get_field("password").attname: (self.password_column, False)}
+        for name, value in USER_FLAGS.items():
+            try:
+                columns[meta.get_field(name).attname] = (self.constant_column(value), False)
+            except FieldDoesNotExist:
+                pass
+        fields = [meta.get_field(model_cls.USERNAME_FIELD)]
+        try:
+            fields.append(meta.get_field(model_cls.get_email_field_name()))
+        except FieldDoesNotExist:
+            pass
+        for field in fields:
+            if not isinstance(field, CharField) or field.choices:
+                continue
+            if column := self.counter_strings(field, EMAIL_DOMAIN if isinstance(field, EmailField) else ""):
+                columns[field.attname] = (column, True)
+        return columns
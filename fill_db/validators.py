@@ -0,0 +1,111 @@
+from typing import Any, Callable, Optional
+
+from django.core.validators import (
+    MaxLengthValidator, MaxValueValidator, MinLengthValidator, MinValueValidator, RegexValidator,
+)
+from django.db.models import CharField, DecimalField, Field as ModelField, FloatField, IntegerField, TextField
+
+from .exceptions import UnsatisfiableFieldError
+from .patterns import Pattern, compile_pattern
+from .schema import Field
+
+
+LIMIT_VALIDATORS = {
+    MinValueValidator: "min_value",
+    MaxValueValidator: "max_value",
+    MinLengthValidator: "min_length",
+    MaxLengthValidator: "max_length",
+}
+LOWER_BOUNDS = frozenset(["min_value", "min_length"])
+
+
+def describe_validator(validator: Callable) -> dict[str, Any]:
+    # Описание валидатора для кэша схемы. Подклассы могут переопределять проверку, поэтому сравнивается точный класс.
+    validator_cls = type(validator)
+    if validator_cls is RegexValidator and not validator.inverse_match:
+        return {"type": "regex", "regex": validator.regex.pattern, "flags": validator.regex.flags}
+    if validator_cls in LIMIT_VALIDATORS:
+        limit = validator.limit_value
+        if isinstance(limit, (int, float)) and not isinstance(limit, bool):
+            return {"type": LIMIT_VALIDATORS[validator_cls], "limit": limit}
+    path = validator if hasattr(validator, "__qualname__") else validator_cls
+    return {"type": "opaque", "path": f"{path.__module__}.{path.__qualname__}"}
+
+
+def describe_validators(field: ModelField) -> list[dict[str, Any]]:
+    # Только объявленные в модели валидаторы: встроенные проверки типа поля генераторы соблюдают сами.
+    return [describe_validator(validator) for validator in field._validators]
+
+
+class FieldView:
+    """Model field with bounds narrowed by its validators; everything else is read from the field."""
+
+    def __init__(self, field: ModelField, **bounds):
+        self.field = field
+        self.__dict__.update(bounds)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.field, name)
+
+    @property
+    def __class__(self) -> type:
+        # isinstance видит класс поля, а не обертки: генераторы выбирают поведение по типу поля.
+        return type(self.field)
+
+
+class Constraints:
+
+    __slots__ = ("min_value", "max_value", "min_length", "max_length", "pattern", "opaque")
+
+    def __init__(self, max_length: Optional[int] = None):
+        self.min_value = None
+        self.max_value = None
+        self.min_length = None
+        self.max_length = max_length
+        self.pattern: Optional[Pattern] = None
+        self.opaque: list[Callable] = []
+
+    def narrow(self, kind: str, limit: Any) -> None:
+        current = getattr(self, kind)
+        if current is None:
+            setattr(self, kind, limit)
+        else:
+            setattr(self, kind, max(current, limit) if kind in LOWER_BOUNDS else min(current, limit))
+
+    @classmethod
+    def compile(cls, field: ModelField, cached: Field) -> "Constraints":
+
+        constraints = cls(cached.max_length)
+        is_string = isinstance(field, (CharField, TextField)) and not field.choices
+        is_number = isinstance(field, (IntegerField, FloatField, DecimalField)) and not field.choices
+        regex_validator = None
+        for validator, descriptor in zip(field._validators, cached.validators):
+            kind = descriptor["type"]
+            if kind == "regex" and is_string and constraints.pattern is None:
+                if pattern := compile_pattern(descriptor["regex"], descriptor["flags"]):
+                    constraints.pattern = pattern
+                    regex_validator = validator
+                    continue
+            elif kind in ("min_value", "max_value") and is_number or kind in ("min_length", "max_length") and is_string:
+                constraints.narrow(kind, descriptor["limit"])
+                continue
+            constraints.opaque.append(validator)
+
+        min_length, max_length = constraints.min_length, constraints.max_length
+        if min_length is not None and max_length is not None and min_length > max_length:
+            raise UnsatisfiableFieldError(
+                f"Field {field.model._meta.label_lower}.{field.name} requires min length {min_length} "
+                f"over max length {max_length}"
+            )
+        if constraints.pattern:
+            constraints.pattern = constraints.pattern.fit(min_length, max_length)
+            if not constraints.pattern:
+                constraints.opaque.append(regex_validator)
+        return constraints
+
+    def view(self, field: ModelField) -> ModelField:
+        bounds = {name: getattr(self, name) for name in ("min_value", "max_value", "min_length")}
+        bounds = {name: value for name, value in bounds.items() if value is not None}
+        if self.max_length != field.max_length:
+            bounds["max_length"] = self.max_length
+        return FieldView(field, **bounds) if bounds else field
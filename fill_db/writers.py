@@ -0,0 +1,163 @@
+import io
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
+from django.db import connection
+from django.db.models import DateField, DateTimeField, Field as ModelField, FileField, Model, TimeField
+from django.utils import timezone
+
+
+# Сгенерированные значения этих типов уже годятся для драйвера, get_db_prep_save для них не вызывается.
+PASS_THROUGH_TYPES = frozenset([
+    "CharField", "SlugField", "TextField", "EmailField", "URLField", "FileField", "ImageField",
+    "IntegerField", "SmallIntegerField", "BigIntegerField", "PositiveIntegerField", "PositiveSmallIntegerField",
+    "PositiveBigIntegerField", "AutoField", "BigAutoField", "SmallAutoField",
+    "FloatField", "BooleanField", "NullBooleanField",
+])
+# pre_save этих полей либо ничего не меняет для сгенерированных значений, либо повторяется писателем (auto_now).
+KNOWN_PRE_SAVE = (DateField, TimeField, FileField)
+
+Chunk = list[list]
+
+
+class OrmWriter:
+
+    def __init__(self, model_cls: type[Model], include_pk: bool = True, ignore_conflicts: bool = False):
+        self.model_cls = model_cls
+        self.ignore_conflicts = ignore_conflicts
+
+    def prepare(self, chunks: Iterator[Chunk]) -> Iterator[list[Model]]:
+        for values in chunks:
+            yield [self.model_cls(*args) for args in zip(*values)]
+
+    def write(self, batch: list[Model]) -> int:
+        self.model_cls._default_manager.bulk_create(
+            batch, batch_size=len(batch), ignore_conflicts=self.ignore_conflicts,
+        )
+        return len(batch)
+
+
+class RawWriter(OrmWriter):
+    """
+    Writes column batches with one driver call per batch, without model
+    instances or ORM SQL compilation. Values go through get_db_prep_save
+    unless the field type is known to need no conversion, auto_now fields
+    get the current time like Model.save() would set.
+    """
+
+    def __init__(self, model_cls: type[Model], include_pk: bool = True, ignore_conflicts: bool = False):
+        super().__init__(model_cls, include_pk, ignore_conflicts)
+        fields = model_cls._meta.concrete_fields
+        self.indices = [i for i, field in enumerate(fields) if include_pk or not field.primary_key]
+        self.fields = [fields[i] for i in self.indices]
+        self.converters = [self.get_converter(field) for field in self.fields]
+        self.table = connection.ops.quote_name(model_cls._meta.db_table)
+        self.columns_sql = ", ".join(connection.ops.quote_name(field.column) for field in self.fields)
+
+    @classmethod
+    def supports(cls, model_cls: type[Model], ignore_conflicts: bool = False) -> bool:
+        # Наследование через несколько таблиц и поля с собственным pre_save остаются за ORM.
+        if model_cls._meta.parents:
+            return False
+        return all(
+            type(field).pre_save is ModelField.pre_save or isinstance(field, KNOWN_PRE_SAVE)
+            for field in model_cls._meta.concrete_fields
+        )
+
+    @staticmethod
+    def get_converter(field: ModelField) -> Optional[Callable[[Any], Any]]:
+        # У fk значения - ключи родителя, решает тип его первичного ключа.
+        target = field.target_field if field.is_relation else field
+        if target.get_internal_type() in PASS_THROUGH_TYPES:
+            return None
+        return partial(field.get_db_prep_save, connection=connection)
+
+    @staticmethod
+    def auto_now(field: ModelField) -> Any:
+        # То же значение, что выставил бы pre_save при добавлении строки.
+        if isinstance(field, DateTimeField):
+            return timezone.now()
+        if isinstance(field, DateField):
+            return date.today()
+        return datetime.now().time()
+
+    def get_columns(self, values: Chunk) -> Chunk:
+        columns = []
+        for index, field, converter in zip(self.indices, self.fields, self.converters):
+            column = values[index]
+            if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+                value = self.auto_now(field)
+                column = [converter(value) if converter else value] * len(column)
+            elif converter:
+                column = list(map(converter, column))
+            columns.append(column)
+        return columns
+
+
+class SQLiteWriter(RawWriter):
+
+    def __init__(self, model_cls: type[Model], include_pk: bool = True, ignore_conflicts: bool = False):
+        super().__init__(model_cls, include_pk, ignore_conflicts)
+        placeholders = ", ".join(["%s"] * len(self.fields))
+        verb = "INSERT OR IGNORE" if ignore_conflicts else "INSERT"
+        self.sql = f"{verb} INTO {self.table} ({self.columns_sql}) VALUES ({placeholders})"
+
+    def prepare(self, chunks: Iterator[Chunk]) -> Iterator[list[tuple]]:
+        for values in chunks:
+            yield list(zip(*self.get_columns(values)))
+
+    def write(self, batch: list[tuple]) -> int:
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, batch)
+        return len(batch)
+
+
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_text(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    return str(value).translate(COPY_ESCAPES)
+
+
+class PostgresCopyWriter(RawWriter):
+
+    def __init__(self, model_cls: type[Model], include_pk: bool = True, ignore_conflicts: bool = False):
+        super().__init__(model_cls, include_pk, ignore_conflicts)
+        self.sql = f"COPY {self.table} ({self.columns_sql}) FROM STDIN"
+
+    @classmethod
+    def supports(cls, model_cls: type[Model], ignore_conflicts: bool = False) -> bool:
+        # COPY не умеет пропускать конфликтующие строки.
+        return not ignore_conflicts and super().supports(model_cls, ignore_conflicts)
+
+    def prepare(self, chunks: Iterator[Chunk]) -> Iterator[tuple[io.StringIO, int]]:
+        for values in chunks:
+            columns = [list(map(copy_text, column)) for column in self.get_columns(values)]
+            rows = list(map("\t".join, zip(*columns)))
+            yield io.StringIO("\n".join(rows) + "\n" if rows else ""), len(rows)
+
+    def write(self, batch: tuple[io.StringIO, int]) -> int:
+        buffer, count = batch
+        with connection.cursor() as cursor:
+            cursor.copy_expert(self.sql, buffer)
+        return count
+
+
+RAW_WRITERS: dict[str, type[RawWriter]] = {
+    "sqlite": SQLiteWriter,
+    "postgresql": PostgresCopyWriter,
+}
+
+
+def get_raw_writer(model_cls: type[Model], ignore_conflicts: bool = False) -> Optional[type[RawWriter]]:
+    writer_cls = RAW_WRITERS.get(connection.vendor)
+    if writer_cls and writer_cls.supports(model_cls, ignore_conflicts):
+        return writer_cls
+    return None